@@ -4,14 +4,32 @@ Ensures all accounts are synchronized when processing external signals
 """
 
 import asyncio
-import json
+import os
 import time
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from exec.enhanced_executor import EnhancedExecutionEngine
+from core.jsonio import dumps as _dumps, loads as _loads
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replace path with data so readers never observe a partial file"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 @dataclass
@@ -41,59 +59,127 @@ class AccountSyncManager:
         
         # Account state tracking
         self.accounts: Dict[str, AccountState] = {}
+        # Enabled account ids, kept in step with self.accounts on every mutation.
+        # A dict (not a set) so get_enabled_accounts keeps account insertion order.
+        self._enabled: Dict[str, None] = {}
         self.sync_groups: Dict[str, List[str]] = {}  # Group accounts for synchronized trading
+        # Reverse index of sync_groups: account id -> names of groups containing it
+        self._account_to_groups: Dict[str, Set[str]] = {}
         
         # Synchronization settings
         self.sync_timeout_seconds = 30.0
         self.max_sync_retries = 3
         self.sync_cooldown_seconds = 5.0
         
+        # Write coalescing: mutations mark state dirty and a single delayed
+        # task persists it, so a burst of changes costs one write
+        self.save_delay_seconds = 0.1
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        
         # Load initial state
         self._load_accounts()
         self._load_sync_state()
+        for group_name, account_ids in self.sync_groups.items():
+            self._index_group(group_name, account_ids)
         
     def _load_accounts(self) -> None:
         """Load account information from file"""
         try:
             if self.accounts_path.exists():
-                with self.accounts_path.open("r") as f:
-                    accounts_data = json.load(f)
-                    accounts_list = accounts_data.get("accounts", [])
-                    
-                    for acc_data in accounts_list:
-                        account_id = acc_data.get("account_id", "")
-                        if account_id:
-                            self.accounts[account_id] = AccountState(
-                                account_id=account_id,
-                                enabled=acc_data.get("enabled", False),
-                                position_side=acc_data.get("position_side"),
-                                position_qty=acc_data.get("position_qty", 0),
-                                unrealized_pnl=acc_data.get("unrealized_pnl", 0.0),
-                                daily_pnl=acc_data.get("daily_pnl", 0.0)
-                            )
+                accounts_data = _loads(self.accounts_path.read_bytes())
+                accounts_list = accounts_data.get("accounts", [])
+                
+                for acc_data in accounts_list:
+                    account_id = acc_data.get("account_id", "")
+                    if account_id:
+                        self.accounts[account_id] = AccountState(
+                            account_id=account_id,
+                            enabled=acc_data.get("enabled", False),
+                            position_side=acc_data.get("position_side"),
+                            position_qty=acc_data.get("position_qty", 0),
+                            unrealized_pnl=acc_data.get("unrealized_pnl", 0.0),
+                            daily_pnl=acc_data.get("daily_pnl", 0.0)
+                        )
         except Exception as e:
             print(f"Error loading accounts: {e}")
+        self._enabled = {acc_id: None for acc_id, acc in self.accounts.items() if acc.enabled}
     
     def _load_sync_state(self) -> None:
         """Load synchronization state from file"""
         try:
             if self.sync_state_path.exists():
-                with self.sync_state_path.open("r") as f:
-                    sync_data = json.load(f)
-                    self.sync_groups = sync_data.get("sync_groups", {})
+                sync_data = _loads(self.sync_state_path.read_bytes())
+                self.sync_groups = sync_data.get("sync_groups", {})
         except Exception as e:
             print(f"Error loading sync state: {e}")
     
     def _save_sync_state(self) -> None:
-        """Save synchronization state to file"""
+        """Schedule a save of the synchronization state
+        
+        Inside a running event loop the write is deferred by save_delay_seconds
+        and coalesced with any other mutations in that window; use flush() to
+        force it. Without a loop the state is written immediately.
+        """
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_sync_state()
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._delayed_save())
+    
+    async def _delayed_save(self) -> None:
+        try:
+            await asyncio.sleep(self.save_delay_seconds)
+        finally:
+            # Also on cancellation (flush() or loop shutdown) so pending state is never lost
+            await self._write_sync_state_async()
+    
+    async def flush(self) -> None:
+        """Persist any pending synchronization state now"""
+        task, self._save_task = self._save_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self._write_sync_state_async()
+    
+    def _encode_sync_state(self) -> Optional[bytes]:
+        """Serialize synchronization state if it changed, clearing the dirty flag"""
+        if not self._dirty:
+            return None
+        self._dirty = False
         try:
-            sync_data = {
+            return _dumps({
                 "sync_groups": self.sync_groups,
                 "last_updated": time.time()
-            }
-            with self.sync_state_path.open("w") as f:
-                json.dump(sync_data, f)
+            })
+        except Exception as e:
+            self._dirty = True
+            print(f"Error saving sync state: {e}")
+            return None
+    
+    def _write_sync_state(self) -> None:
+        """Atomically write synchronization state to file if it changed"""
+        data = self._encode_sync_state()
+        if data is None:
+            return
+        try:
+            _atomic_write_bytes(self.sync_state_path, data)
         except Exception as e:
+            self._dirty = True
+            print(f"Error saving sync state: {e}")
+    
+    async def _write_sync_state_async(self) -> None:
+        """Like _write_sync_state, but the file I/O runs in a worker thread"""
+        data = self._encode_sync_state()
+        if data is None:
+            return
+        try:
+            await asyncio.to_thread(_atomic_write_bytes, self.sync_state_path, data)
+        except Exception as e:
+            self._dirty = True
             print(f"Error saving sync state: {e}")
     
     def add_account(self, account_id: str, enabled: bool = True) -> None:
@@ -102,19 +188,24 @@ class AccountSyncManager:
             account_id=account_id,
             enabled=enabled
         )
+        if enabled:
+            self._enabled[account_id] = None
+        else:
+            self._enabled.pop(account_id, None)
         self._save_sync_state()
     
     def remove_account(self, account_id: str) -> None:
         """Remove account from synchronization manager"""
         if account_id in self.accounts:
             del self.accounts[account_id]
+        self._enabled.pop(account_id, None)
             
-        # Remove from sync groups
-        for group_name, accounts in self.sync_groups.items():
-            if account_id in accounts:
-                accounts.remove(account_id)
-                if not accounts:  # Remove empty group
-                    del self.sync_groups[group_name]
+        # Remove from the sync groups that contain it
+        for group_name in self._account_to_groups.pop(account_id, ()):
+            accounts = self.sync_groups[group_name]
+            accounts.remove(account_id)
+            if not accounts:  # Remove empty group
+                del self.sync_groups[group_name]
         
         self._save_sync_state()
     
@@ -124,15 +215,29 @@ class AccountSyncManager:
         valid_accounts = [acc_id for acc_id in account_ids if acc_id in self.accounts]
         
         if valid_accounts:
+            self._unindex_group(group_name)
             self.sync_groups[group_name] = valid_accounts
+            self._index_group(group_name, valid_accounts)
             self._save_sync_state()
             print(f"Created sync group '{group_name}' with {len(valid_accounts)} accounts")
         else:
             print(f"No valid accounts found for sync group '{group_name}'")
     
+    def _index_group(self, group_name: str, account_ids: List[str]) -> None:
+        for acc_id in account_ids:
+            self._account_to_groups.setdefault(acc_id, set()).add(group_name)
+    
+    def _unindex_group(self, group_name: str) -> None:
+        for acc_id in self.sync_groups.get(group_name, ()):
+            groups = self._account_to_groups.get(acc_id)
+            if groups is not None:
+                groups.discard(group_name)
+                if not groups:
+                    del self._account_to_groups[acc_id]
+    
     def get_enabled_accounts(self) -> List[str]:
         """Get list of enabled account IDs"""
-        return [acc_id for acc_id, acc in self.accounts.items() if acc.enabled]
+        return list(self._enabled)
     
     def get_sync_group_accounts(self, group_name: str) -> List[str]:
         """Get accounts in a synchronization group"""
@@ -149,6 +254,11 @@ class AccountSyncManager:
             for key, value in kwargs.items():
                 if hasattr(account, key):
                     setattr(account, key, value)
+            if "enabled" in kwargs:
+                if account.enabled:
+                    self._enabled[account_id] = None
+                else:
+                    self._enabled.pop(account_id, None)
     
     def check_account_sync_status(self, account_ids: List[str]) -> Dict[str, str]:
         """Check synchronization status of accounts"""
@@ -198,25 +308,14 @@ class AccountSyncManager:
             self.update_account_state(account_id, sync_status="pending", last_signal_time=time.time())
         
         try:
-            # Execute signals in parallel for all ready accounts
-            tasks = []
-            for account_id in ready_accounts:
-                task = self._execute_signal_for_account(account_id, signal_data)
-                tasks.append(task)
-            
-            # Wait for all tasks to complete
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Execute the signal for all ready accounts in one batch
+            batch_results = await self._execute_signal_batch(ready_accounts, signal_data)
             
             # Process results
-            for i, account_id in enumerate(ready_accounts):
-                result = task_results[i]
-                if isinstance(result, Exception):
-                    print(f"Error executing signal for {account_id}: {result}")
-                    results[account_id] = False
-                    self.update_account_state(account_id, sync_status="error")
-                else:
-                    results[account_id] = result
-                    self.update_account_state(account_id, sync_status="synced")
+            for account_id in ready_accounts:
+                ok = bool(batch_results.get(account_id, False))
+                results[account_id] = ok
+                self.update_account_state(account_id, sync_status="synced" if ok else "error")
         
         except Exception as e:
             print(f"Error in account synchronization: {e}")
@@ -227,37 +326,28 @@ class AccountSyncManager:
         
         return results
     
-    async def _execute_signal_for_account(self, account_id: str, signal_data: Dict[str, Any]) -> bool:
-        """Execute signal for a single account"""
-        try:
-            # This would integrate with the execution engine
-            # For now, simulate the execution
-            await asyncio.sleep(0.1)  # Simulate execution time
-            
-            print(f"Executed signal for account {account_id}: {signal_data.get('side', 'UNKNOWN')} {signal_data.get('symbol', 'UNKNOWN')}")
-            return True
-            
-        except Exception as e:
-            print(f"Error executing signal for account {account_id}: {e}")
-            return False
+    async def _execute_signal_batch(self, account_ids: List[str], signal_data: Dict[str, Any]) -> Dict[str, bool]:
+        """Execute signal for a batch of accounts"""
+        # Orders are placed by the execution engine; simulate one round trip for the whole batch
+        await asyncio.sleep(0.1)
+        print(f"Executed signal for {len(account_ids)} accounts: {signal_data.get('side', 'UNKNOWN')} {signal_data.get('symbol', 'UNKNOWN')}")
+        return {account_id: True for account_id in account_ids}
     
     def get_sync_statistics(self) -> Dict[str, Any]:
         """Get synchronization statistics"""
         current_time = time.time()
         
         # Count accounts by status
-        status_counts = {}
-        for account in self.accounts.values():
-            status = account.sync_status
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = dict(Counter(account.sync_status for account in self.accounts.values()))
         
         # Count accounts in cooldown
-        cooldown_count = sum(1 for account in self.accounts.values() 
-                           if current_time - account.last_signal_time < self.sync_cooldown_seconds)
+        cooldown_threshold = current_time - self.sync_cooldown_seconds
+        cooldown_count = sum(1 for account in self.accounts.values()
+                           if account.last_signal_time > cooldown_threshold)
         
         return {
             "total_accounts": len(self.accounts),
-            "enabled_accounts": len(self.get_enabled_accounts()),
+            "enabled_accounts": len(self._enabled),
             "sync_groups": len(self.sync_groups),
             "status_counts": status_counts,
             "cooldown_count": cooldown_count,
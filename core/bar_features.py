@@ -5,8 +5,10 @@ Calculates delta confidence and other features based on completed bars rather th
 
 import numpy as np
 from dataclasses import dataclass
+from math import tanh
 from typing import Optional, List
-from collections import deque
+
+from .buffers import RollingSlope
 
 
 @dataclass
@@ -22,7 +24,7 @@ class BarData:
     sell_volume: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BarFeatureSnapshot:
     """Feature snapshot calculated from bars"""
     cvd: float
@@ -38,20 +40,79 @@ class BarFeatureSnapshot:
     price_momentum: float
 
 
+# Delta confidence factor weights
+_W_CVD_SLOPE = 0.4
+_W_VOLUME_TREND = 0.3
+_W_BUY_RATIO = 0.3
+_RECENT_BARS = 10
+
+# Row layout of BarFeatureEngine's column store
+_TS, _OPEN, _HIGH, _LOW, _CLOSE, _VOL, _BUY, _SELL = range(8)
+_NUM_COLS = 8
+
+
+def _snapshot_kernel(buy: np.ndarray, sell: np.ndarray, bar_sizes: np.ndarray,
+                     cvd_slope: float, volume_trend: float) -> tuple[float, float, float]:
+    """Reduce bar columns to (aggressive_buy_ratio, avg_bar_size, delta_confidence)
+
+    buy/sell hold the most recent bars; bar_sizes may be in any order.
+    """
+    # Aggressive buy ratio from the most recent bars
+    total_buy_volume = float(buy.sum())
+    total_sell_volume = float(sell.sum())
+    total_volume = total_buy_volume + total_sell_volume
+    aggressive_buy_ratio = total_buy_volume / total_volume if total_volume > 0 else 0.5
+    
+    avg_bar_size = float(bar_sizes.mean()) if bar_sizes.size else 0.0
+    
+    # Weight the factors based on bar characteristics
+    cvd_factor = tanh(cvd_slope * 0.01)  # Normalize CVD slope
+    volume_factor = tanh(volume_trend * 0.1)  # Normalize volume trend
+    buy_ratio_factor = (aggressive_buy_ratio - 0.5) * 2.0  # Convert to -1 to 1
+    score = (
+        _W_CVD_SLOPE * cvd_factor +
+        _W_VOLUME_TREND * volume_factor +
+        _W_BUY_RATIO * buy_ratio_factor
+    )
+    
+    # Convert to 0-1 confidence scale
+    delta_confidence = 0.5 * (score + 1.0)
+    if delta_confidence < 0.0:
+        delta_confidence = 0.0
+    elif delta_confidence > 1.0:
+        delta_confidence = 1.0
+    return aggressive_buy_ratio, avg_bar_size, delta_confidence
+
+
 class BarFeatureEngine:
     """Feature engine that calculates metrics from completed bars"""
     
     def __init__(self, window: int = 20) -> None:
         self.window = window
-        self.bars: deque = deque(maxlen=window)
-        self.cvd_series: deque = deque(maxlen=window)
-        self.volume_series: deque = deque(maxlen=window)
-        self.price_series: deque = deque(maxlen=window)
+        # SoA bar storage: one float64 row per field, written at a shared cursor
+        self._cols = np.zeros((_NUM_COLS, window), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self.cvd_series = RollingSlope(window)
+        self.volume_series = RollingSlope(window)
         self._cvd = 0.0
+        # Features only change when a bar closes; repeat snapshots reuse this
+        self._snapshot_cache: Optional[BarFeatureSnapshot] = None
+        
+    @property
+    def bar_count(self) -> int:
+        """Number of bars currently held in the window"""
+        return self._count
         
     def add_bar(self, bar: BarData) -> None:
         """Add a completed bar and update features"""
-        self.bars.append(bar)
+        self._cols[:, self._head] = (
+            bar.timestamp, bar.open, bar.high, bar.low, bar.close,
+            bar.volume, bar.buy_volume, bar.sell_volume,
+        )
+        self._head = (self._head + 1) % self.window
+        if self._count < self.window:
+            self._count += 1
         
         # Update CVD (Cumulative Volume Delta)
         delta = bar.buy_volume - bar.sell_volume
@@ -60,28 +121,25 @@ class BarFeatureEngine:
         
         # Update series
         self.volume_series.append(bar.volume)
-        self.price_series.append(bar.close)
-        
-    def _calculate_slope(self, series: List[float]) -> float:
-        """Calculate slope of a series"""
-        if len(series) < 2:
-            return 0.0
-        
-        x = np.arange(len(series), dtype=np.float64)
-        y = np.array(series, dtype=np.float64)
-        
-        x_mean = np.mean(x)
-        y_mean = np.mean(y)
-        
-        numerator = np.dot(x - x_mean, y - y_mean)
-        denominator = np.dot(x - x_mean, x - x_mean)
+        self._snapshot_cache = None
         
-        if denominator == 0:
-            return 0.0
-            
-        return float(numerator / denominator)
+    def _columns(self) -> np.ndarray:
+        """Bar columns ordered oldest to newest (a view until the window wraps)"""
+        if self._count < self.window:
+            return self._cols[:, :self._count]
+        return np.concatenate((self._cols[:, self._head:], self._cols[:, :self._head]), axis=1)
+    
+    def _tail(self, n: int) -> np.ndarray:
+        """Columns of the last n bars, oldest first; a view unless they straddle the wrap point"""
+        n = min(n, self._count)
+        start = self._head - n
+        if start >= 0:
+            return self._cols[:, start:self._head]
+        if self._head == 0:
+            return self._cols[:, start:]
+        return np.concatenate((self._cols[:, start:], self._cols[:, :self._head]), axis=1)
     
-    def _calculate_momentum(self, series: List[float], periods: int = 5) -> float:
+    def _calculate_momentum(self, series: np.ndarray, periods: int = 5) -> float:
         """Calculate momentum over specified periods"""
         if len(series) < periods:
             return 0.0
@@ -90,74 +148,59 @@ class BarFeatureEngine:
         return float((recent[-1] - recent[0]) / recent[0]) if recent[0] != 0 else 0.0
     
     def snapshot(self) -> BarFeatureSnapshot:
-        """Calculate feature snapshot from bars"""
-        if len(self.bars) < 2:
+        """Calculate feature snapshot from bars (cached until the next add_bar)"""
+        if self._snapshot_cache is not None:
+            return self._snapshot_cache
+        if self._count < 2:
             return BarFeatureSnapshot(
                 cvd=0.0, cvd_slope=0.0, depth_imbalance=0.0, depth_slope=0.0,
                 aggressive_buy_ratio=0.5, delta_confidence=0.5, bar_count=0,
                 avg_bar_size=0.0, volume_trend=0.0, price_momentum=0.0
             )
         
-        # Calculate CVD slope
-        cvd_slope = self._calculate_slope(list(self.cvd_series))
+        # Calculate CVD slope (running sums maintained in add_bar)
+        cvd_slope = self.cvd_series.slope()
         
         # Calculate volume trend
-        volume_trend = self._calculate_slope(list(self.volume_series))
+        volume_trend = self.volume_series.slope()
         
         # Calculate price momentum
-        price_momentum = self._calculate_momentum(list(self.price_series))
-        
-        # Calculate aggressive buy ratio from recent bars
-        recent_bars = list(self.bars)[-10:]  # Last 10 bars
-        total_buy_volume = sum(bar.buy_volume for bar in recent_bars)
-        total_sell_volume = sum(bar.sell_volume for bar in recent_bars)
-        total_volume = total_buy_volume + total_sell_volume
-        
-        aggressive_buy_ratio = total_buy_volume / total_volume if total_volume > 0 else 0.5
-        
-        # Calculate average bar size
-        bar_sizes = [bar.high - bar.low for bar in self.bars]
-        avg_bar_size = np.mean(bar_sizes) if bar_sizes else 0.0
-        
-        # Calculate delta confidence using bar-based features
-        # Weight the factors based on bar characteristics
-        cvd_factor = np.tanh(cvd_slope * 0.01)  # Normalize CVD slope
-        volume_factor = np.tanh(volume_trend * 0.1)  # Normalize volume trend
-        buy_ratio_factor = (aggressive_buy_ratio - 0.5) * 2.0  # Convert to -1 to 1
-        
-        # Combine factors with weights
-        weights = {
-            "cvd_slope": 0.4,
-            "volume_trend": 0.3,
-            "buy_ratio": 0.3
-        }
-        
-        score = (
-            weights["cvd_slope"] * cvd_factor +
-            weights["volume_trend"] * volume_factor +
-            weights["buy_ratio"] * buy_ratio_factor
+        price_momentum = self._calculate_momentum(self._tail(5)[_CLOSE])
+        
+        # Numeric reductions run in one kernel; only the recent-bar slice needs
+        # ordering, the bar-size mean reads the filled storage as-is
+        recent = self._tail(_RECENT_BARS)
+        buy = recent[_BUY]
+        sell = recent[_SELL]
+        filled = self._cols[:, :self._count]
+        bar_sizes = filled[_HIGH] - filled[_LOW]
+        aggressive_buy_ratio, avg_bar_size, delta_confidence = _snapshot_kernel(
+            buy, sell, bar_sizes, cvd_slope, volume_trend
         )
         
-        # Convert to 0-1 confidence scale
-        delta_confidence = max(0.0, min(1.0, 0.5 * (score + 1.0)))
-        
-        return BarFeatureSnapshot(
+        self._snapshot_cache = BarFeatureSnapshot(
             cvd=self._cvd,
             cvd_slope=cvd_slope,
             depth_imbalance=0.0,  # Not applicable for bar-based
             depth_slope=0.0,      # Not applicable for bar-based
             aggressive_buy_ratio=aggressive_buy_ratio,
             delta_confidence=delta_confidence,
-            bar_count=len(self.bars),
+            bar_count=self._count,
             avg_bar_size=avg_bar_size,
             volume_trend=volume_trend,
             price_momentum=price_momentum
         )
+        return self._snapshot_cache
     
     def get_recent_bars(self, count: int = 5) -> List[BarData]:
         """Get recent bars for analysis"""
-        return list(self.bars)[-count:] if len(self.bars) >= count else list(self.bars)
+        cols = self._columns()[:, -count:]
+        return [
+            BarData(timestamp=float(ts), open=float(o), high=float(h), low=float(l), close=float(c),
+                    volume=float(v), buy_volume=float(b), sell_volume=float(s))
+            for ts, o, h, l, c, v, b, s in cols.T
+        ]
     
     def is_ready(self) -> bool:
         """Check if engine has enough data for reliable calculations"""
-        return len(self.bars) >= 5  # Need at least 5 bars
+        return self._count >= 5  # Need at least 5 bars
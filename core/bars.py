@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import logging
 import time
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional, List
 from core.smm.common import HeikenAshiState, update_heiken_ashi
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class Bar:
@@ -17,14 +21,28 @@ class Bar:
     end_ts: float
 
 
-class BarAggregator:
+class BarAggregator(ABC):
     """Simple bar aggregator supporting time-based bars and tick-count bars.
 
     mode: "time" or "ticks"
       - time: create a new bar every duration_sec seconds
       - ticks: create a new bar every ticks_per_bar ticks
+
+    Constructing a BarAggregator returns a mode-specialized subclass so the
+    per-tick update() carries no mode branch. Bar state lives in fixed slots
+    rather than an instance __dict__ since update() touches it on every tick.
     """
 
+    __slots__ = (
+        "mode", "duration_sec", "ticks_per_bar",
+        "_open", "_high", "_low", "_close", "_volume", "_start_ts", "_tick_count",
+    )
+
+    def __new__(cls, mode: str = "time", duration_sec: int = 60, ticks_per_bar: int = 200) -> "BarAggregator":
+        if cls is BarAggregator:
+            cls = _TimeBarAggregator if mode == "time" else _TickBarAggregator
+        return super().__new__(cls)
+
     def __init__(self, mode: str = "time", duration_sec: int = 60, ticks_per_bar: int = 200) -> None:
         self.mode = mode
         self.duration_sec = int(duration_sec)
@@ -46,63 +64,95 @@ class BarAggregator:
         self._start_ts = None
         self._tick_count = 0
 
+    def _begin(self, price: float, size: float, now: float) -> None:
+        self._open = price
+        self._high = price
+        self._low = price
+        self._close = price
+        self._volume = float(size)
+        self._start_ts = now
+        self._tick_count = 1
+
+    def _close_bar(self, price: float, now: float) -> Bar:
+        bar = Bar(
+            open=self._open,
+            high=self._high,
+            low=self._low,
+            close=price,
+            volume=self._volume,
+            start_ts=float(self._start_ts),
+            end_ts=now,
+        )
+        # Start next bar with current state as seed for responsiveness
+        self._open = price
+        self._high = price
+        self._low = price
+        self._close = price
+        self._volume = 0.0
+        self._start_ts = now
+        self._tick_count = 0
+        return bar
+
+    @abstractmethod
+    def update(self, price: float, size: float, ts: Optional[float] = None) -> List[Bar]:
+        """Feed one trade; return the bars it closed (usually empty)."""
+
+
+class _TimeBarAggregator(BarAggregator):
+    """Closes a bar once duration_sec has elapsed since it opened."""
+
+    __slots__ = ()
+
     def update(self, price: float, size: float, ts: Optional[float] = None) -> List[Bar]:
         now = float(ts if ts is not None else time.time())
-        bars: List[Bar] = []
 
         # Initialize current bar if needed
         if self._open is None:
-            self._open = price
-            self._high = price
-            self._low = price
-            self._close = price
-            self._volume = float(size)
-            self._start_ts = now
-            self._tick_count = 1
-            return bars
-
-        # Update current bar
-        if price > (self._high or price):
+            self._begin(price, size, now)
+            return []
+
+        # Update current bar (fields are always populated past the init branch)
+        if price > self._high:
             self._high = price
-        if price < (self._low or price):
+        elif price < self._low:
             self._low = price
         self._close = price
         self._volume += float(size)
         self._tick_count += 1
 
-        # Decide if bar completes
-        should_close = False
-        if self.mode == "time":
-            if self._start_ts is not None:
-                elapsed = now - self._start_ts
-                print(f"BAR AGGREGATOR DEBUG: elapsed={elapsed:.1f}s, duration={self.duration_sec}s, should_close={elapsed >= self.duration_sec}", flush=True)
-                if elapsed >= self.duration_sec:
-                    should_close = True
-        else:  # ticks
-            if self._tick_count >= self.ticks_per_bar:
-                should_close = True
-
-        if should_close:
-            bar = Bar(
-                open=self._open or price,
-                high=self._high or price,
-                low=self._low or price,
-                close=self._close or price,
-                volume=self._volume,
-                start_ts=float(self._start_ts or now),
-                end_ts=now,
-            )
-            bars.append(bar)
-            # Start next bar with current state as seed for responsiveness
-            self._open = price
+        elapsed = now - self._start_ts
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("elapsed=%.1fs duration=%ds should_close=%s", elapsed, self.duration_sec, elapsed >= self.duration_sec)
+        if elapsed >= self.duration_sec:
+            return [self._close_bar(price, now)]
+        return []
+
+
+class _TickBarAggregator(BarAggregator):
+    """Closes a bar every ticks_per_bar ticks."""
+
+    __slots__ = ()
+
+    def update(self, price: float, size: float, ts: Optional[float] = None) -> List[Bar]:
+        now = float(ts if ts is not None else time.time())
+
+        # Initialize current bar if needed
+        if self._open is None:
+            self._begin(price, size, now)
+            return []
+
+        # Update current bar (fields are always populated past the init branch)
+        if price > self._high:
             self._high = price
+        elif price < self._low:
             self._low = price
-            self._close = price
-            self._volume = 0.0
-            self._start_ts = now
-            self._tick_count = 0
+        self._close = price
+        self._volume += float(size)
+        self._tick_count += 1
 
-        return bars
+        if self._tick_count >= self.ticks_per_bar:
+            return [self._close_bar(price, now)]
+        return []
 
 
 class TBarsAggregator:
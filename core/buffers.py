@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
 
 class RingBuffer:
     def __init__(self, capacity: int) -> None:
@@ -13,24 +13,105 @@ class RingBuffer:
         self.index = (self.index + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    def append_with_evicted(self, value: float) -> Optional[float]:
+        """Append and return the value that was overwritten, or None while filling."""
+        evicted = float(self.buffer[self.index]) if self.size == self.capacity else None
+        self.append(value)
+        return evicted
+
     def values(self) -> np.ndarray:
+        """Ordered copy (oldest first) once full; prefer the *_fast helpers on hot paths."""
         if self.size < self.capacity:
             return self.buffer[:self.size]
         return np.concatenate((self.buffer[self.index:], self.buffer[:self.index]))
 
+    def view_pair(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (older, newer) views whose concatenation equals values()."""
+        if self.size < self.capacity:
+            return self.buffer[:self.size], self.buffer[:0]
+        return self.buffer[self.index:], self.buffer[:self.index]
+
+    def last(self) -> float:
+        return float(self.buffer[self.index - 1]) if self.size else 0.0
+
+    def sum_fast(self) -> float:
+        # Summation order does not matter, so reduce the backing slots directly
+        return float(np.sum(self.buffer[:self.size]))
+
+    def mean_fast(self) -> float:
+        return self.sum_fast() / self.size if self.size else 0.0
+
+    def dot_fast(self, other: np.ndarray) -> float:
+        """Dot product with an array aligned to values() (oldest first), without the concat."""
+        older, newer = self.view_pair()
+        split = len(older)
+        return float(np.dot(older, other[:split]) + np.dot(newer, other[split:self.size]))
+
+class RollingSlope:
+    """Least-squares slope of a sliding window (x = 0..n-1), updated in O(1) per append.
+
+    Keeps running sums of y and i*y; the x-side terms depend only on n and are
+    closed-form. Sums are re-derived from the buffer once per full rotation so
+    floating-point drift cannot accumulate.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.series = RingBuffer(capacity)
+        self.sum_y = 0.0
+        self.sum_iy = 0.0
+        # x-side constants; the full-window values cover the steady state
+        self._x = np.arange(capacity, dtype=np.float64)
+        self._full_x_mean = 0.5 * (capacity - 1)
+        self._full_sxx = capacity * (capacity * capacity - 1) / 12.0
+
+    def append(self, value: float) -> None:
+        n = self.series.size
+        evicted = self.series.append_with_evicted(value)
+        if evicted is None:
+            self.sum_iy += n * value
+            self.sum_y += value
+        else:
+            # Dropping the oldest point shifts every remaining index down by one
+            self.sum_iy += (n - 1) * value - (self.sum_y - evicted)
+            self.sum_y += value - evicted
+            if self.series.index == 0:
+                self._resync()
+
+    def _resync(self) -> None:
+        # Index the two ring halves against the cached x vector instead of concatenating
+        older, newer = self.series.view_pair()
+        split = len(older)
+        self.sum_y = float(older.sum() + newer.sum())
+        self.sum_iy = float(np.dot(self._x[:split], older) + np.dot(self._x[split:split + len(newer)], newer))
+
+    def slope(self) -> float:
+        n = self.series.size
+        if n == self.series.capacity and n > 1:
+            return (self.sum_iy - self._full_x_mean * self.sum_y) / self._full_sxx
+        if n < 2:
+            return 0.0
+        sxx = n * (n * n - 1) / 12.0
+        return (self.sum_iy - 0.5 * (n - 1) * self.sum_y) / sxx
+
+
 class Ema:
     def __init__(self, period: int) -> None:
         self.alpha = 2.0 / (period + 1)
         self.prev: Optional[float] = None
         self.prev_prev: Optional[float] = None
+        # The first update seeds the average, then rebinds update to the steady-state path
+        self.update = self._update_first
 
-    def update(self, price: float) -> float:
-        if self.prev is None:
-            self.prev = price
-            self.prev_prev = price
-        else:
-            self.prev_prev = self.prev
-            self.prev = (price - self.prev) * self.alpha + self.prev
+    def _update_first(self, price: float) -> float:
+        self.prev = price
+        self.prev_prev = price
+        self.update = self._update_steady
+        return price
+
+    def _update_steady(self, price: float) -> float:
+        prev = self.prev
+        self.prev_prev = prev
+        self.prev = (price - prev) * self.alpha + prev
         return self.prev
 
     def slope(self) -> float:
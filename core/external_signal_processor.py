@@ -4,20 +4,46 @@ Processes external signals from NinjaTrader and integrates with SMM execution en
 """
 
 import asyncio
-import json
+import logging
 import time
 import os
+import sys
+from collections import OrderedDict, deque
+from itertools import takewhile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-from exec.enhanced_executor import EnhancedExecutionEngine
-from core.symbols import SymbolManager
+from exec.enhanced_executor import EnhancedExecutionEngine, EnhancedOrderIntent
 from core.account_sync_manager import AccountSyncManager, get_sync_manager
+from core.jsonio import dumps as json_dumps, loads as json_loads
 
+try:
+    from asyncinotify import Inotify, Mask
+except ImportError:  # Linux-only optional dependency; stat polling is the fallback
+    Inotify = None
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Upper bound on remembered signal keys for duplicate detection
+MAX_DEDUP_KEYS = 10_000
+# Processed-signal records buffered before a write is forced
+MAX_PENDING_RECORDS = 64
+# Entry submissions collected before the executor batch is dispatched early
+MAX_SUBMIT_BATCH = 32
+# Stat poll interval for the signals file when inotify is unavailable
+SIGNAL_FILE_POLL_SECONDS = 0.05
+# How often signals held back by cooldown or rate limiting are retried
+DEFERRED_RETRY_SECONDS = 0.5
+# Rejections that only mean "not yet"; such signals are retried instead of dropped
+RETRYABLE_REJECTIONS = frozenset({"cooldown", "rate_limited"})
+
+# Duplicate-detection key: (source, symbol, side, signal_type, timestamp)
+SignalKey = Tuple[str, str, str, str, float]
+
+
+@dataclass(slots=True, frozen=True)
 class ExternalSignalData:
     """External signal data structure"""
     timestamp: float
@@ -31,6 +57,31 @@ class ExternalSignalData:
     atr_value: float
     exchange: str
     processed: bool = False
+    
+    def __post_init__(self) -> None:
+        # Normalize once so dispatch compares against constants without re-casing, and
+        # intern the low-cardinality fields so dedup keys hash and compare cheaply
+        object.__setattr__(self, "side", sys.intern(self.side.upper()))
+        object.__setattr__(self, "signal_type", sys.intern(self.signal_type.upper()))
+        object.__setattr__(self, "symbol", sys.intern(self.symbol))
+        object.__setattr__(self, "source", sys.intern(self.source))
+        object.__setattr__(self, "exchange", sys.intern(self.exchange))
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_timestamp: float = 0.0) -> "ExternalSignalData":
+        """Build a signal from a parsed JSON record, applying field defaults"""
+        return cls(
+            timestamp=data.get("timestamp", default_timestamp),
+            symbol=data.get("symbol", ""),
+            side=data.get("side", ""),
+            signal_type=data.get("signal_type", ""),
+            price=data.get("price", 0.0),
+            reason=data.get("reason", ""),
+            source=data.get("source", ""),
+            confidence_score=data.get("confidence_score", 0.8),
+            atr_value=data.get("atr_value", 0.0),
+            exchange=data.get("exchange", "CME")
+        )
 
 
 class ExternalSignalProcessor:
@@ -53,6 +104,7 @@ class ExternalSignalProcessor:
         self.last_processed_timestamp = 0.0
         self.signal_cooldown_seconds = 5.0  # Minimum time between processing signals
         self.max_signals_per_minute = 10
+        self.max_concurrent_signals = 8
         
         # Filter controls
         self.long_signals_enabled = True
@@ -61,47 +113,101 @@ class ExternalSignalProcessor:
         # Load configuration
         self._load_filters()
         
-        # Track processed signals to avoid duplicates
-        self.processed_signals: Dict[str, float] = {}
+        # Track processed signals to avoid duplicates: key -> processed time,
+        # in processing order and capped at MAX_DEDUP_KEYS (oldest evicted first)
+        self.processed_signals: "OrderedDict[SignalKey, float]" = OrderedDict()
+        self._total_processed = 0
+        # Processing times within the last minute, for rate limiting
+        self._recent_ts: Deque[float] = deque()
+        
+        # Byte offset of the first unread line in external_signals_path
+        self._read_offset = 0
+        # Signals read from the file but held back by cooldown/rate limit, retried later
+        self._deferred: Dict[SignalKey, ExternalSignalData] = {}
+        
+        # Processed-signal records are buffered and appended in batches
+        self.record_flush_delay_seconds = 0.1
+        self._pending_records: List[bytes] = []
+        self._record_flush_task: Optional[asyncio.Task] = None
+        
+        # Entry submissions are micro-batched into one executor call
+        self.submit_batch_window_seconds = 0.005
+        self._submit_batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._submit_timer: Optional[asyncio.TimerHandle] = None
+        self._submit_tasks: Set[asyncio.Task] = set()
+        
+        # Parsed state files keyed by path, tagged with (st_mtime_ns, st_size)
+        self._file_cache: Dict[Path, Tuple[int, int, Any]] = {}
         
     def _load_filters(self) -> None:
         """Load signal filter settings"""
         try:
             if self.signal_filters_path.exists():
-                with self.signal_filters_path.open("r") as f:
-                    filters = json.load(f)
-                    self.long_signals_enabled = filters.get("long_signals_enabled", True)
-                    self.short_signals_enabled = filters.get("short_signals_enabled", True)
+                filters = json_loads(self.signal_filters_path.read_bytes())
+                self.long_signals_enabled = filters.get("long_signals_enabled", True)
+                self.short_signals_enabled = filters.get("short_signals_enabled", True)
         except Exception as e:
-            print(f"Error loading filters: {e}")
+            logger.error("Error loading filters: %s", e)
             self.long_signals_enabled = True
             self.short_signals_enabled = True
     
     def _should_process_signal(self, signal: ExternalSignalData) -> bool:
         """Check if signal should be processed based on filters and cooldown"""
+        return self._rejection_reason(signal) is None
+    
+    def _rejection_reason(self, signal: ExternalSignalData) -> Optional[str]:
+        """Why the signal cannot be processed right now, or None if it can"""
         # Check cooldown
         current_time = time.time()
         if current_time - self.last_processed_timestamp < self.signal_cooldown_seconds:
-            return False
+            return "cooldown"
         
         # Check signal filters
-        if signal.side.upper() == "BUY" and not self.long_signals_enabled:
-            return False
-        if signal.side.upper() == "SELL" and not self.short_signals_enabled:
-            return False
+        if signal.side == "BUY" and not self.long_signals_enabled:
+            return "long_disabled"
+        if signal.side == "SELL" and not self.short_signals_enabled:
+            return "short_disabled"
         
         # Check for duplicate signals
-        signal_key = f"{signal.source}_{signal.symbol}_{signal.side}_{signal.signal_type}_{signal.timestamp}"
-        if signal_key in self.processed_signals:
-            return False
+        if self._signal_key(signal) in self.processed_signals:
+            return "duplicate"
         
         # Check rate limiting
-        recent_signals = sum(1 for ts in self.processed_signals.values() 
-                           if current_time - ts < 60.0)
-        if recent_signals >= self.max_signals_per_minute:
-            return False
+        recent_ts = self._recent_ts
+        while recent_ts and current_time - recent_ts[0] >= 60.0:
+            recent_ts.popleft()
+        if len(recent_ts) >= self.max_signals_per_minute:
+            return "rate_limited"
         
-        return True
+        return None
+    
+    @staticmethod
+    def _signal_key(signal: ExternalSignalData) -> SignalKey:
+        return (signal.source, signal.symbol, signal.side, signal.signal_type, signal.timestamp)
+    
+    def _mark_processed(self, signal_key: SignalKey, processed_at: float) -> None:
+        """Remember a processed signal for dedup and rate limiting"""
+        self.processed_signals[signal_key] = processed_at
+        # Keep the map ordered by processing time even if a key is re-marked
+        self.processed_signals.move_to_end(signal_key)
+        if len(self.processed_signals) > MAX_DEDUP_KEYS:
+            self.processed_signals.popitem(last=False)
+        self._recent_ts.append(processed_at)
+        self._total_processed += 1
+    
+    def _load_cached(self, path: Path) -> Optional[Any]:
+        """Parse a JSON state file, reusing the last result while its stat is unchanged"""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._file_cache.pop(path, None)
+            return None
+        cached = self._file_cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        value = json_loads(path.read_bytes())
+        self._file_cache[path] = (st.st_mtime_ns, st.st_size, value)
+        return value
     
     def _get_active_accounts(self) -> List[str]:
         """Get list of active trading accounts using sync manager"""
@@ -112,28 +218,24 @@ class ExternalSignalProcessor:
                 return enabled_accounts
             
             # Fallback to direct file reading
-            accounts_path = self.state_dir / "accounts.json"
-            if accounts_path.exists():
-                with accounts_path.open("r") as f:
-                    accounts_data = json.load(f)
-                    accounts = accounts_data.get("accounts", [])
-                    return [acc["account_id"] for acc in accounts if acc.get("enabled", False)]
+            accounts_data = self._load_cached(self.state_dir / "accounts.json")
+            if accounts_data is not None:
+                accounts = accounts_data.get("accounts", [])
+                return [acc["account_id"] for acc in accounts if acc.get("enabled", False)]
         except Exception as e:
-            print(f"Error loading accounts: {e}")
+            logger.error("Error loading accounts: %s", e)
         return []
     
     def _get_current_price(self, symbol: str) -> Optional[float]:
         """Get current market price for symbol"""
         try:
             # Try to get from metrics file
-            metrics_path = self.state_dir / "metrics.json"
-            if metrics_path.exists():
-                with metrics_path.open("r") as f:
-                    metrics = json.load(f)
-                    if metrics.get("last_price", 0) > 0:
-                        return metrics["last_price"]
+            metrics = self._load_cached(self.state_dir / "metrics.json")
+            if metrics is not None:
+                if metrics.get("last_price", 0) > 0:
+                    return metrics["last_price"]
         except Exception as e:
-            print(f"Error getting current price: {e}")
+            logger.error("Error getting current price: %s", e)
         return None
     
     def _calculate_atr_value(self, symbol: str) -> float:
@@ -146,7 +248,7 @@ class ExternalSignalProcessor:
         try:
             accounts = self._get_active_accounts()
             if not accounts:
-                print("No active accounts found for signal processing")
+                logger.warning("No active accounts found for signal processing")
                 return
             
             current_price = self._get_current_price(signal.symbol)
@@ -176,11 +278,11 @@ class ExternalSignalProcessor:
             failed_accounts = [acc for acc, success in sync_results.items() if not success]
             
             if successful_accounts:
-                print(f"Processed {signal.signal_type} signal: {signal.side} {signal.symbol} at {current_price}")
-                print(f"Successfully synchronized across {len(successful_accounts)} accounts: {successful_accounts}")
+                logger.info("Processed %s signal: %s %s at %s", signal.signal_type, signal.side, signal.symbol, current_price)
+                logger.info("Successfully synchronized across %s accounts: %s", len(successful_accounts), successful_accounts)
                 
                 # Submit signal to execution engine for successful accounts
-                intents = await self.executor.submit_enhanced_signal(
+                intents = await self._submit_entry(
                     symbol=signal.symbol,
                     side=signal.side,
                     confidence_score=signal.confidence_score,
@@ -192,22 +294,63 @@ class ExternalSignalProcessor:
                 )
                 
                 if intents:
-                    print(f"Generated {len(intents)} order intents")
+                    logger.info("Generated %s order intents", len(intents))
                 else:
-                    print(f"No order intents generated for signal: {signal.side} {signal.symbol}")
+                    logger.warning("No order intents generated for signal: %s %s", signal.side, signal.symbol)
             
             if failed_accounts:
-                print(f"Failed to synchronize signal for {len(failed_accounts)} accounts: {failed_accounts}")
+                logger.warning("Failed to synchronize signal for %s accounts: %s", len(failed_accounts), failed_accounts)
                 
         except Exception as e:
-            print(f"Error processing entry signal: {e}")
+            logger.error("Error processing entry signal: %s", e)
+    
+    async def _submit_entry(self, **kwargs: Any) -> List[EnhancedOrderIntent]:
+        """Queue a submit_enhanced_signal call into the current micro-batch and await its intents"""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._submit_batch.append((kwargs, fut))
+        if len(self._submit_batch) >= MAX_SUBMIT_BATCH:
+            self._flush_submit_batch()
+        elif self._submit_timer is None:
+            self._submit_timer = loop.call_later(self.submit_batch_window_seconds, self._flush_submit_batch)
+        return await fut
+    
+    def _flush_submit_batch(self) -> None:
+        """Dispatch the pending micro-batch as one executor call"""
+        if self._submit_timer is not None:
+            self._submit_timer.cancel()
+            self._submit_timer = None
+        batch, self._submit_batch = self._submit_batch, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_submit_batch(batch))
+            self._submit_tasks.add(task)
+            task.add_done_callback(self._submit_tasks.discard)
+    
+    async def _run_submit_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            results = await self.executor.submit_enhanced_signal_batch(
+                [kwargs for kwargs, _ in batch], return_exceptions=True
+            )
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        # Each caller gets only its own signal's outcome
+        for (_, fut), result in zip(batch, results):
+            if fut.done():
+                continue
+            if isinstance(result, Exception):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
     
     async def _process_exit_signal(self, signal: ExternalSignalData) -> None:
         """Process exit signal"""
         try:
             # For exit signals, we need to close existing positions
             # This would integrate with the position management system
-            print(f"Processing exit signal: {signal.side} {signal.symbol} at {signal.price}")
+            logger.info("Processing exit signal: %s %s at %s", signal.side, signal.symbol, signal.price)
             
             # TODO: Implement position closing logic
             # This would involve:
@@ -216,26 +359,32 @@ class ExternalSignalProcessor:
             # 3. Submitting close orders
             
         except Exception as e:
-            print(f"Error processing exit signal: {e}")
+            logger.error("Error processing exit signal: %s", e)
     
-    async def process_signal(self, signal: ExternalSignalData) -> bool:
-        """Process a single external signal"""
+    async def process_signal(self, signal: ExternalSignalData, retry_throttled: bool = False) -> bool:
+        """Process a single external signal
+        
+        With retry_throttled, a signal turned away only by cooldown or rate
+        limiting is kept and offered again by process_new_signals.
+        """
         try:
-            if not self._should_process_signal(signal):
+            reason = self._rejection_reason(signal)
+            if reason is not None:
+                if retry_throttled and reason in RETRYABLE_REJECTIONS:
+                    self._deferred[self._signal_key(signal)] = signal
                 return False
             
             # Mark signal as processed
-            signal_key = f"{signal.source}_{signal.symbol}_{signal.side}_{signal.signal_type}_{signal.timestamp}"
-            self.processed_signals[signal_key] = time.time()
             self.last_processed_timestamp = time.time()
+            self._mark_processed(self._signal_key(signal), self.last_processed_timestamp)
             
             # Process based on signal type
-            if signal.signal_type.upper() == "ENTRY":
+            if signal.signal_type == "ENTRY":
                 await self._process_entry_signal(signal)
-            elif signal.signal_type.upper() == "EXIT":
+            elif signal.signal_type == "EXIT":
                 await self._process_exit_signal(signal)
             else:
-                print(f"Unknown signal type: {signal.signal_type}")
+                logger.warning("Unknown signal type: %s", signal.signal_type)
                 return False
             
             # Record processed signal
@@ -243,11 +392,16 @@ class ExternalSignalProcessor:
             return True
             
         except Exception as e:
-            print(f"Error processing signal: {e}")
+            logger.error("Error processing signal: %s", e)
             return False
     
     def _record_processed_signal(self, signal: ExternalSignalData) -> None:
-        """Record processed signal for tracking"""
+        """Record processed signal for tracking
+        
+        Inside a running event loop records are buffered and appended in one
+        write after record_flush_delay_seconds (or once MAX_PENDING_RECORDS
+        are queued); use flush_records() to force it.
+        """
         try:
             processed_data = {
                 "timestamp": signal.timestamp,
@@ -261,25 +415,90 @@ class ExternalSignalProcessor:
                 "processed_at": time.time()
             }
             
-            with self.processed_signals_path.open("a") as f:
-                f.write(json.dumps(processed_data) + "\n")
-                
+            self._pending_records.append(json_dumps(processed_data) + b"\n")
         except Exception as e:
-            print(f"Error recording processed signal: {e}")
+            logger.error("Error recording processed signal: %s", e)
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending_records()
+            return
+        task = self._record_flush_task
+        if len(self._pending_records) >= MAX_PENDING_RECORDS:
+            # Write this batch now instead of waiting out the delay
+            self._record_flush_task = loop.create_task(self._delayed_record_flush(0.0))
+            if task is not None:
+                task.cancel()
+        elif task is None or task.done():
+            self._record_flush_task = loop.create_task(self._delayed_record_flush(self.record_flush_delay_seconds))
+    
+    async def _delayed_record_flush(self, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            # Also on cancellation (flush_records() or loop shutdown) so no record is lost
+            if self._record_flush_task is asyncio.current_task():
+                self._record_flush_task = None
+            data = self._take_pending_records()
+            if data:
+                await asyncio.to_thread(self._append_records, data)
+    
+    async def flush_records(self) -> None:
+        """Write any buffered processed-signal records now"""
+        task, self._record_flush_task = self._record_flush_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        data = self._take_pending_records()
+        if data:
+            await asyncio.to_thread(self._append_records, data)
+    
+    def _take_pending_records(self) -> bytes:
+        records, self._pending_records = self._pending_records, []
+        return b"".join(records)
+    
+    def _write_pending_records(self) -> None:
+        """Append all buffered records with a single write"""
+        data = self._take_pending_records()
+        if data:
+            self._append_records(data)
+    
+    def _append_records(self, data: bytes) -> None:
+        try:
+            with self.processed_signals_path.open("ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logger.error("Error recording processed signal: %s", e)
     
     def load_new_signals(self) -> List[ExternalSignalData]:
-        """Load new external signals from file"""
+        """Load external signals appended to the file since the last call"""
         signals = []
         try:
             if not self.external_signals_path.exists():
+                self._read_offset = 0
                 return signals
             
-            with self.external_signals_path.open("r") as f:
-                lines = f.readlines()
+            with self.external_signals_path.open("rb") as f:
+                if f.seek(0, os.SEEK_END) < self._read_offset:
+                    # File was truncated or replaced; start over
+                    self._read_offset = 0
+                f.seek(self._read_offset)
+                data = f.read()
+            
+            # Leave a partially written last line for the next call
+            end = data.rfind(b"\n") + 1
+            self._read_offset += end
+            lines = data[:end].splitlines()
                 
             for line in lines:
+                if not line.strip():
+                    continue
                 try:
-                    signal_data = json.loads(line.strip())
+                    signal_data = json_loads(line)
                     
                     # Skip if already processed
                     if signal_data.get("processed", False):
@@ -289,73 +508,74 @@ class ExternalSignalProcessor:
                     if signal_data.get("timestamp", 0) <= self.last_processed_timestamp:
                         continue
                     
-                    signal = ExternalSignalData(
-                        timestamp=signal_data.get("timestamp", 0),
-                        symbol=signal_data.get("symbol", ""),
-                        side=signal_data.get("side", ""),
-                        signal_type=signal_data.get("signal_type", ""),
-                        price=signal_data.get("price", 0.0),
-                        reason=signal_data.get("reason", ""),
-                        source=signal_data.get("source", ""),
-                        confidence_score=signal_data.get("confidence_score", 0.8),
-                        atr_value=signal_data.get("atr_value", 0.0),
-                        exchange=signal_data.get("exchange", "CME")
-                    )
+                    signal = ExternalSignalData.from_dict(signal_data)
                     
                     signals.append(signal)
                     
                 except Exception as e:
-                    print(f"Error parsing signal line: {e}")
+                    logger.error("Error parsing signal line: %s", e)
                     continue
             
             # Sort by timestamp
             signals.sort(key=lambda x: x.timestamp)
             
         except Exception as e:
-            print(f"Error loading signals: {e}")
+            logger.error("Error loading signals: %s", e)
         
         return signals
     
+    @property
+    def has_deferred_signals(self) -> bool:
+        return bool(self._deferred)
+    
+    def _take_deferred_signals(self) -> List[ExternalSignalData]:
+        """Pop held-back signals, dropping those a later processed signal superseded"""
+        deferred, self._deferred = self._deferred, {}
+        cutoff = self.last_processed_timestamp
+        return [s for s in deferred.values() if s.timestamp > cutoff]
+    
     async def process_new_signals(self) -> int:
-        """Process all new external signals"""
-        signals = self.load_new_signals()
-        processed_count = 0
+        """Process all new external signals concurrently (up to max_concurrent_signals)
         
-        for signal in signals:
-            if await self.process_signal(signal):
-                processed_count += 1
+        Signals previously held back by cooldown or rate limiting are offered again first.
+        """
+        signals = self._take_deferred_signals() + self.load_new_signals()
+        if not signals:
+            return 0
+        signals.sort(key=lambda x: x.timestamp)
         
-        return processed_count
+        # process_signal checks filters/cooldown and marks the signal processed
+        # before its first await, so concurrent dispatch cannot double-admit
+        sem = asyncio.Semaphore(self.max_concurrent_signals)
+        
+        async def _one(signal: ExternalSignalData) -> bool:
+            async with sem:
+                return await self.process_signal(signal, retry_throttled=True)
+        
+        # process_signal never raises, so one task group can pipeline the whole
+        # burst: each signal's submit waits only on its own account sync
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_one(s)) for s in signals]
+        return sum(1 for t in tasks if t.result() is True)
     
     async def process_signal_from_data(self, signal_data: Dict[str, Any]) -> bool:
         """Process signal from dictionary data (from web API)"""
         try:
-            signal = ExternalSignalData(
-                timestamp=signal_data.get("timestamp", time.time()),
-                symbol=signal_data.get("symbol", ""),
-                side=signal_data.get("side", ""),
-                signal_type=signal_data.get("signal_type", ""),
-                price=signal_data.get("price", 0.0),
-                reason=signal_data.get("reason", ""),
-                source=signal_data.get("source", ""),
-                confidence_score=signal_data.get("confidence_score", 0.8),
-                atr_value=signal_data.get("atr_value", 0.0),
-                exchange=signal_data.get("exchange", "CME")
-            )
+            signal = ExternalSignalData.from_dict(signal_data, default_timestamp=time.time())
             
             return await self.process_signal(signal)
             
         except Exception as e:
-            print(f"Error processing signal from data: {e}")
+            logger.error("Error processing signal from data: %s", e)
             return False
     
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get signal processing statistics"""
         current_time = time.time()
         
-        # Count recent signals
-        recent_signals = sum(1 for ts in self.processed_signals.values() 
-                           if current_time - ts < 300.0)  # Last 5 minutes
+        # Count recent signals (newest first, stopping at the first older one)
+        recent_signals = sum(1 for _ in takewhile(lambda ts: current_time - ts < 300.0,
+                                                  reversed(self.processed_signals.values())))  # Last 5 minutes
         
         return {
             "last_processed_timestamp": self.last_processed_timestamp,
@@ -364,7 +584,7 @@ class ExternalSignalProcessor:
             "short_signals_enabled": self.short_signals_enabled,
             "signal_cooldown_seconds": self.signal_cooldown_seconds,
             "max_signals_per_minute": self.max_signals_per_minute,
-            "total_processed_signals": len(self.processed_signals)
+            "total_processed_signals": self._total_processed
         }
     
     def update_filters(self, long_enabled: bool, short_enabled: bool) -> None:
@@ -380,13 +600,12 @@ class ExternalSignalProcessor:
                 "updated_at": time.time()
             }
             
-            with self.signal_filters_path.open("w") as f:
-                json.dump(filter_config, f)
+            self.signal_filters_path.write_bytes(json_dumps(filter_config))
                 
-            print(f"Updated signal filters: Long={long_enabled}, Short={short_enabled}")
+            logger.info("Updated signal filters: Long=%s, Short=%s", long_enabled, short_enabled)
                 
         except Exception as e:
-            print(f"Error saving filters: {e}")
+            logger.error("Error saving filters: %s", e)
     
     def get_filter_status(self) -> Dict[str, Any]:
         """Get current filter status"""
@@ -431,19 +650,59 @@ def get_signal_processor() -> ExternalSignalProcessor:
         _processor_instance = ExternalSignalProcessor()
     return _processor_instance
 
-async def process_external_signals_loop():
-    """Background loop to process external signals"""
-    processor = get_signal_processor()
+async def _signal_file_changes(path: Path) -> AsyncIterator[None]:
+    """Yield once up front and then whenever the signals file may have new data"""
+    if Inotify is not None:
+        with Inotify() as inotify:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            inotify.add_watch(path.parent, Mask.MODIFY | Mask.CLOSE_WRITE | Mask.MOVED_TO | Mask.CREATE)
+            yield None
+            async for event in inotify:
+                if event.name is not None and str(event.name) == path.name:
+                    yield None
+        return
     
+    # Fallback: poll the file's stat and only wake the reader when it changes
+    last = object()
+    while True:
+        try:
+            st = path.stat()
+            current = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            current = None
+        if current != last:
+            last = current
+            yield None
+        await asyncio.sleep(SIGNAL_FILE_POLL_SECONDS)
+
+async def _retry_deferred_signals(processor: ExternalSignalProcessor) -> None:
+    """Re-offer signals held back by cooldown/rate limit; the file watcher alone would not wake for them"""
     while True:
+        await asyncio.sleep(DEFERRED_RETRY_SECONDS)
+        if not processor.has_deferred_signals:
+            continue
         try:
             processed_count = await processor.process_new_signals()
             if processed_count > 0:
-                print(f"Processed {processed_count} external signals")
-            
-            # Wait before next check
-            await asyncio.sleep(1.0)
-            
+                logger.info("Processed %s deferred external signals", processed_count)
         except Exception as e:
-            print(f"Error in signal processing loop: {e}")
-            await asyncio.sleep(5.0)
+            logger.error("Error retrying deferred signals: %s", e)
+
+async def process_external_signals_loop():
+    """Background loop to process external signals as the signals file changes"""
+    processor = get_signal_processor()
+    retry_task = asyncio.create_task(_retry_deferred_signals(processor))
+    
+    try:
+        while True:
+            try:
+                async for _ in _signal_file_changes(processor.external_signals_path):
+                    processed_count = await processor.process_new_signals()
+                    if processed_count > 0:
+                        logger.info("Processed %s external signals", processed_count)
+                
+            except Exception as e:
+                logger.error("Error in signal processing loop: %s", e)
+                await asyncio.sleep(5.0)
+    finally:
+        retry_task.cancel()
@@ -1,10 +1,11 @@
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict, Optional
+from math import tanh
+from typing import Dict, Optional, Tuple
 
-from .buffers import RingBuffer
+from .buffers import RingBuffer, RollingSlope
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FeatureSnapshot:
     cvd: float
     cvd_slope: float
@@ -13,11 +14,15 @@ class FeatureSnapshot:
     aggressive_buy_ratio: float
     delta_confidence: float
 
+def _squash(x: float) -> float:
+    # Logistic 1 / (1 + exp(-x)) as one libm call; cannot overflow for large |x|
+    return 0.5 * (1.0 + tanh(0.5 * x))
+
 class FeatureEngine:
     def __init__(self, window: int = 256, weights: Optional[Dict[str, float]] = None) -> None:
         self.buy_volume = RingBuffer(window)
         self.sell_volume = RingBuffer(window)
-        self.cvd_series = RingBuffer(window)
+        self.cvd_series = RollingSlope(window)
         self.depth_imbalance_series = RingBuffer(window)
         self.depth_slope_series = RingBuffer(window)
         self.weights = weights or {
@@ -26,52 +31,76 @@ class FeatureEngine:
             "aggressive_buy_ratio": 0.3,
         }
         self._cvd = 0.0
+        # Per-depth (n, 2) matrices of [1, level] so one matmul yields (sum, weighted sum)
+        self._level_weights: Dict[int, np.ndarray] = {}
+        # Running window totals of buy/sell volume, kept in step with the ring buffers
+        self._total_buys = 0.0
+        self._total_sells = 0.0
+        # Bumped by every update_*; snapshot() recomputes only when it has moved
+        self._update_counter = 0
+        self._cached_snapshot: Tuple[int, Optional[FeatureSnapshot]] = (-1, None)
 
     def update_trades(self, buy_qty: float, sell_qty: float) -> None:
-        self.buy_volume.append(buy_qty)
-        self.sell_volume.append(sell_qty)
+        evicted_buy = self.buy_volume.append_with_evicted(buy_qty)
+        evicted_sell = self.sell_volume.append_with_evicted(sell_qty)
+        if evicted_buy is None:
+            self._total_buys += buy_qty
+            self._total_sells += sell_qty
+        elif self.buy_volume.index == 0:
+            # Re-derive once per rotation so floating-point drift cannot accumulate
+            self._total_buys = self.buy_volume.sum_fast()
+            self._total_sells = self.sell_volume.sum_fast()
+        else:
+            self._total_buys += buy_qty - evicted_buy
+            self._total_sells += sell_qty - evicted_sell
         self._cvd += (buy_qty - sell_qty)
         self.cvd_series.append(self._cvd)
+        self._update_counter += 1
+
+    def _weights_for(self, n: int) -> np.ndarray:
+        weights = self._level_weights.get(n)
+        if weights is None:
+            weights = np.ones((n, 2), dtype=np.float64)
+            weights[:, 1] = np.arange(1, n + 1, dtype=np.float64)
+            self._level_weights[n] = weights
+        return weights
 
     def update_orderbook(self, bid_qty_levels: np.ndarray, ask_qty_levels: np.ndarray) -> None:
-        bid_sum = float(np.sum(bid_qty_levels)) + 1e-9
-        ask_sum = float(np.sum(ask_qty_levels)) + 1e-9
+        bid_sum, bid_weighted = (bid_qty_levels @ self._weights_for(len(bid_qty_levels))).tolist()
+        ask_sum, ask_weighted = (ask_qty_levels @ self._weights_for(len(ask_qty_levels))).tolist()
+        bid_sum += 1e-9
+        ask_sum += 1e-9
         depth_imbalance = (bid_sum - ask_sum) / (bid_sum + ask_sum)
         self.depth_imbalance_series.append(depth_imbalance)
 
-        weights = np.arange(1, len(bid_qty_levels) + 1, dtype=np.float64)
-        bid_weighted = float(np.dot(bid_qty_levels, weights))
-        ask_weighted = float(np.dot(ask_qty_levels, weights))
         depth_slope = (bid_weighted - ask_weighted) / (bid_weighted + ask_weighted + 1e-9)
         self.depth_slope_series.append(depth_slope)
+        self._update_counter += 1
 
-    def _slope(self, series: RingBuffer) -> float:
-        vals = series.values()
-        if len(vals) < 2:
-            return 0.0
-        x = np.arange(len(vals), dtype=np.float64)
-        x_mean = np.mean(x)
-        y_mean = np.mean(vals)
-        num = float(np.dot(x - x_mean, vals - y_mean))
-        den = float(np.dot(x - x_mean, x - x_mean)) + 1e-9
-        return num / den
+    def _slope(self, series: RollingSlope) -> float:
+        # Running sums are maintained on append, so this is O(1)
+        return series.slope()
 
     def snapshot(self) -> FeatureSnapshot:
+        # Reuse the last result between updates; FeatureSnapshot is frozen so sharing it is safe
+        counter, snap = self._cached_snapshot
+        if counter == self._update_counter:
+            return snap
+        snap = self._compute_snapshot()
+        self._cached_snapshot = (self._update_counter, snap)
+        return snap
+
+    def _compute_snapshot(self) -> FeatureSnapshot:
         cvd_slope = self._slope(self.cvd_series)
-        depth_imbalance = (self.depth_imbalance_series.values()[-1] if self.depth_imbalance_series.size else 0.0)
-        depth_slope = (self.depth_slope_series.values()[-1] if self.depth_slope_series.size else 0.0)
-        buys = self.buy_volume.values()
-        sells = self.sell_volume.values()
-        total_buys = float(np.sum(buys))
-        total_sells = float(np.sum(sells))
+        depth_imbalance = self.depth_imbalance_series.last()
+        depth_slope = self.depth_slope_series.last()
+        total_buys = self._total_buys
+        total_sells = self._total_sells
         aggressive_buy_ratio = total_buys / (total_buys + total_sells + 1e-9)
 
-        def squash(x: float) -> float:
-            return 1.0 / (1.0 + np.exp(-x))
-
         w = self.weights
         score = (
-            w["cvd_slope"] * (squash(cvd_slope) - 0.5) * 2.0 +
+            w["cvd_slope"] * (_squash(cvd_slope) - 0.5) * 2.0 +
             w["depth_imbalance"] * depth_imbalance +
             w["aggressive_buy_ratio"] * (aggressive_buy_ratio - 0.5) * 2.0
         )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
 from typing import Optional
 import time
@@ -10,7 +11,7 @@ from .dashboard import DashboardEngine
 from .main import SMMMainEngine, SMMDecision
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CombinedDecision:
     side: Optional[str]
     reason: str
@@ -18,7 +19,22 @@ class CombinedDecision:
     trend_state: int
 
 
+# Slots of the packed confirmation memory; other sources only mark that a source has reported
+_SRC_IDX = {"tbar12": 0, "time1m": 1, "ticks233": 2}
+_SIDE_CODE = {"BUY": 1, "SELL": -1}
+
+
 class SMMCombinedSignal:
+    # (main side, trend state) -> (final side, default reason) when main has a side
+    _MAIN_TREND_TABLE = {
+        ("BUY", 1): ("BUY", "main_buy"),
+        ("BUY", 0): (None, "trend_mismatch"),
+        ("BUY", -1): (None, "trend_mismatch"),
+        ("SELL", -1): ("SELL", "main_sell"),
+        ("SELL", 0): (None, "trend_mismatch"),
+        ("SELL", 1): (None, "trend_mismatch"),
+    }
+
     def __init__(self, delta_threshold: float = 0.6) -> None:
         self.dashboard = DashboardEngine()
         # Allow env override for delta threshold
@@ -29,9 +45,10 @@ class SMMCombinedSignal:
             delta_thr_final = float(delta_threshold)
         self.main = SMMMainEngine(delta_threshold=delta_thr_final)
         self._armed: Optional[int] = None  # 1 buy, -1 sell
-        # Cross-source confirmation memory
-        self._confirm_side_by_source: dict[str, Optional[str]] = {}
-        self._confirm_ts_by_source: dict[str, float] = {}
+        # Cross-source confirmation memory, indexed by _SRC_IDX: side code +1/-1/0 and stamp
+        self._confirm_sides = array("b", [0, 0, 0])
+        self._confirm_times = array("d", [0.0, 0.0, 0.0])
+        self._confirm_seen = False
         self._confirm_window_secs: float = 10.0
         # Testing and gating flags (env tunable)
         self.require_cross_source: bool = os.getenv("REQUIRE_XSOURCE", "1") not in ("0", "false", "False")
@@ -39,12 +56,28 @@ class SMMCombinedSignal:
         self.testing_sell_bias: bool = os.getenv("TESTING_SELL_BIAS", "0") in ("1", "true", "True")
         # Optional trend override source: None or 'ema21'
         self.trend_override: Optional[str] = os.getenv("TREND_OVERRIDE") or None
+        # Testing flags are fixed for the engine's lifetime, so bind the live
+        # evaluate path once instead of re-checking them on every call
+        if not (self.testing_loose or self.testing_sell_bias):
+            self.evaluate = self._evaluate_live
+
+    @staticmethod
+    def _now() -> float:
+        # Monotonic: confirmation ages must not jump with wall-clock adjustments
+        return time.monotonic()
 
     def on_bar(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
         # Update dashboard trend state (Heiken Ashi, ATR, MAs)
-        self.dashboard.on_bar(open_, high, low, close, volume, use_heiken_ashi=True)
+        self.dashboard.on_bar_ha(open_, high, low, close, volume)
         self.main.on_bar(open_, high, low, close, volume)
 
+    def step(self, open_: float, high: float, low: float, close: float, volume: float,
+             last_price: float, features: FeatureSnapshot) -> CombinedDecision:
+        """on_bar() followed by evaluate() in one call, for loops that do both per bar"""
+        self.dashboard.on_bar_ha(open_, high, low, close, volume)
+        self.main.on_bar(open_, high, low, close, volume)
+        return self.evaluate(last_price, features)
+
     def on_bar_source(self, source: str, open_: float, high: float, low: float, close: float, volume: float) -> None:
         """Record per-source confirmation using strong-candle + EMA21 alignment.
 
@@ -53,90 +86,94 @@ class SMMCombinedSignal:
         """
         self.on_bar(open_, high, low, close, volume)
         # Use latest internal EMAs from main
-        ema21_val = getattr(self.main.ema21, "previous_ema", close) or close
-        ema8_val = getattr(self.main.ema8, "previous_ema", close) or close
-        strong_bull = (close > open_) and (low == open_) and (close > ema8_val) and (close > ema21_val)
-        strong_bear = (close < open_) and (high == open_) and (close < ema8_val) and (close < ema21_val)
-        side: Optional[str] = None
-        if strong_bull:
-            side = "BUY"
-        elif strong_bear:
-            side = "SELL"
+        ema21_val = self.main.ema21.previous_ema
+        ema8_val = self.main.ema8.previous_ema
+        if ema21_val is None:
+            ema21_val = close
+        if ema8_val is None:
+            ema8_val = close
+        # +1 strong bull, -1 strong bear, 0 otherwise (the two cannot both hold)
+        side_code = (int(close > open_ and low == open_ and close > ema8_val and close > ema21_val)
+                     - int(close < open_ and high == open_ and close < ema8_val and close < ema21_val))
         # Record confirmation state
-        self._confirm_side_by_source[source] = side
-        self._confirm_ts_by_source[source] = time.time()
+        self._confirm_seen = True
+        idx = _SRC_IDX.get(source)
+        if idx is not None:
+            self._confirm_sides[idx] = side_code
+            self._confirm_times[idx] = self._now()
 
     def evaluate(self, last_price: float, features: FeatureSnapshot) -> CombinedDecision:
         main_decision = self.main.evaluate(last_price, features)
         # EMA55 trend filtering (matches NinjaTrader SMM)
-        ema21_val = main_decision.ema21
-        ema21_slope = main_decision.ema21_slope
-        ema55_val = main_decision.ema55
-        ema55_slope = main_decision.ema55_slope
-        
-        # Use EMA55 trend filtering for primary trend determination
-        # No background bands needed - this is signal calculation only
         trend_state = 1 if main_decision.trend_bullish else (-1 if main_decision.trend_bearish else 0)
-        final_side: Optional[str] = None
-        reason = "hold"
 
         # Testing mode: relax gating to exercise signal generation quickly
         if self.testing_loose:
-            if features.delta_confidence >= self.main.delta_threshold and trend_state == 1:
+            dc = features.delta_confidence
+            thr = self.main.delta_threshold
+            if dc >= thr and trend_state == 1:
                 return CombinedDecision(side="BUY", reason="test_loose_delta_trend", main=main_decision, trend_state=trend_state)
-            if (1.0 - features.delta_confidence) >= self.main.delta_threshold and trend_state == -1:
+            if (1.0 - dc) >= thr and trend_state == -1:
                 return CombinedDecision(side="SELL", reason="test_loose_delta_trend", main=main_decision, trend_state=trend_state)
 
         # Testing SELL bias: prefer SELLs when background trend is bearish
         if self.testing_sell_bias and trend_state == -1:
             return CombinedDecision(side="SELL", reason="test_sell_bias", main=main_decision, trend_state=trend_state)
 
+        return self._gate(main_decision, features, trend_state)
+
+    def _evaluate_live(self, last_price: float, features: FeatureSnapshot) -> CombinedDecision:
+        """evaluate() with the testing-mode branches partially evaluated away"""
+        main_decision = self.main.evaluate(last_price, features)
+        trend_state = 1 if main_decision.trend_bullish else (-1 if main_decision.trend_bearish else 0)
+        return self._gate(main_decision, features, trend_state)
+
+    def _gate(self, main_decision: SMMDecision, features: FeatureSnapshot, trend_state: int) -> CombinedDecision:
+        final_side: Optional[str] = None
+        reason = "hold"
+
         # Prefer main decision if its side agrees with EMA21 trend; otherwise hold
-        if main_decision.side == "BUY":
-            if trend_state == 1:
-                final_side, reason = "BUY", main_decision.reason or "main_buy"
-            else:
-                reason = "trend_mismatch"
-        elif main_decision.side == "SELL":
-            if trend_state == -1:
-                final_side, reason = "SELL", main_decision.reason or "main_sell"
-            else:
-                reason = "trend_mismatch"
+        agreed = self._MAIN_TREND_TABLE.get((main_decision.side, trend_state))
+        if agreed is not None:
+            final_side, reason = agreed
+            if final_side is not None:
+                reason = main_decision.reason or reason
         else:
             # Fallback gating: delta + trend arms
-            if features.delta_confidence >= self.main.delta_threshold and trend_state == 1:
+            dc = features.delta_confidence
+            main = self.main
+            if dc >= main.delta_threshold and trend_state == 1:
                 self._armed = 1
                 reason = "armed_buy"
-            elif (1.0 - features.delta_confidence) >= self.main.delta_threshold and trend_state == -1:
+            elif dc <= main.delta_threshold_lo and trend_state == -1:
                 self._armed = -1
                 reason = "armed_sell"
 
         # Confirm armed state only when main shows strong candle alignment
-        if final_side is None and self._armed is not None:
-            if self._armed == 1 and main_decision.strong_bull and trend_state == 1:
+        armed = self._armed
+        if final_side is None and armed is not None:
+            if armed == 1 and main_decision.strong_bull and trend_state == 1:
                 final_side, reason = "BUY", "armed+confirm"
                 self._armed = None
-            elif self._armed == -1 and main_decision.strong_bear and trend_state == -1:
+            elif armed == -1 and main_decision.strong_bear and trend_state == -1:
                 final_side, reason = "SELL", "armed+confirm"
                 self._armed = None
 
         # Multi-source confirmation: require recent matching side from TBars12
         # or majority of other sources within window. If no sources recorded yet,
         # skip the cross-source requirement (e.g., unit tests / startup).
-        if final_side is not None and self.require_cross_source and len(self._confirm_ts_by_source) > 0:
-            now = time.time()
-            def recent(source: str, side: str) -> bool:
-                s = self._confirm_side_by_source.get(source)
-                ts = self._confirm_ts_by_source.get(source, 0.0)
-                return (s == side) and ((now - ts) <= self._confirm_window_secs)
-
-            if len(self._confirm_ts_by_source) > 0:
-                primary_ok = recent("tbar12", final_side)
-                others = [recent("time1m", final_side), recent("ticks233", final_side)]
-                majority_ok = sum(1 for x in others if x) >= 1
-                if not (primary_ok or majority_ok):
-                    # Not enough cross-source confirmation; hold
-                    final_side, reason = None, "await_xsource_confirm"
+        if final_side is not None and self.require_cross_source and self._confirm_seen:
+            now = self._now()
+            window = self._confirm_window_secs
+            sides = self._confirm_sides
+            times = self._confirm_times
+            side_code = _SIDE_CODE[final_side]
+            primary_ok = sides[0] == side_code and (now - times[0]) <= window
+            majority_ok = (int(sides[1] == side_code and (now - times[1]) <= window)
+                           + int(sides[2] == side_code and (now - times[2]) <= window)) >= 1
+            if not (primary_ok or majority_ok):
+                # Not enough cross-source confirmation; hold
+                final_side, reason = None, "await_xsource_confirm"
 
         # Secondary check: if dashboard background trend disagrees with EMA21 trend, hold until aligned
         dash_trend = self.dashboard.get_trend_state()
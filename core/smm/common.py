@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Deque, Optional, Tuple
+from typing import Optional, Tuple
+
+import numpy as np
 
 
 class ECandleColoringType(str, Enum):
@@ -62,11 +63,10 @@ class ExponentialMA:
         self.previous_ema: Optional[float] = None
 
     def update(self, value: float) -> float:
-        if self.previous_ema is None:
-            self.previous_ema = value
-        else:
-            self.previous_ema = value * self.constant1 + self.constant2 * self.previous_ema
-        return self.previous_ema
+        prev = self.previous_ema
+        ema = value if prev is None else value * self.constant1 + self.constant2 * prev
+        self.previous_ema = ema
+        return ema
 
 
 class AverageTrueRange:
@@ -99,29 +99,60 @@ class MoneyFlowIndex:
         if period <= 1:
             raise ValueError("MFI period must be > 1")
         self.period = period
-        self.typical_price_window: Deque[float] = deque(maxlen=period + 1)
-        self.volume_window: Deque[float] = deque(maxlen=period + 1)
+        # Ring of the last `period` signed money flows (bar vs. its predecessor)
+        self._pos_flows = np.zeros(period, dtype=np.float64)
+        self._neg_flows = np.zeros(period, dtype=np.float64)
+        self._cursor = 0
+        self._count = 0
+        self._pos_sum = 0.0
+        self._neg_sum = 0.0
+        # Bars in the window with negative flow, so an empty side is exactly zero
+        self._neg_bars = 0
+        self._prev_typical_price: Optional[float] = None
         self.current_value: float = float("nan")
 
     def update(self, high: float, low: float, close: float, volume: float) -> float:
         typical_price = (high + low + close) / 3.0
-        self.typical_price_window.appendleft(typical_price)
-        self.volume_window.appendleft(volume)
-        if len(self.typical_price_window) < self.period + 1:
+        prev_tp = self._prev_typical_price
+        self._prev_typical_price = typical_price
+        if prev_tp is None:
             self.current_value = float("nan")
             return self.current_value
-        positive_flow = 0.0
-        negative_flow = 0.0
-        for i in range(self.period):
-            tp_curr = self.typical_price_window[i]
-            tp_prev = self.typical_price_window[i + 1]
-            vol = self.volume_window[i]
-            if tp_curr > tp_prev:
-                positive_flow += vol * tp_curr
-            elif tp_curr < tp_prev:
-                negative_flow += vol * tp_curr
-        if negative_flow > 0.0:
-            mfr = positive_flow / negative_flow
+
+        flow = volume * typical_price
+        pos = flow if typical_price > prev_tp else 0.0
+        neg = flow if typical_price < prev_tp else 0.0
+
+        i = self._cursor
+        if self._count == self.period:
+            # Drop the flow leaving the window before overwriting its slot
+            old_neg = float(self._neg_flows[i])
+            self._pos_sum -= float(self._pos_flows[i])
+            self._neg_sum -= old_neg
+            self._neg_bars -= old_neg > 0.0
+        else:
+            self._count += 1
+        self._pos_flows[i] = pos
+        self._neg_flows[i] = neg
+        self._neg_bars += neg > 0.0
+        i += 1
+        if i == self.period:
+            i = 0
+        self._cursor = i
+        if i == 0 and self._count == self.period:
+            # Re-derive once per rotation so floating-point drift cannot accumulate.
+            # The first rotation is the end of warm-up, so the first MFI value
+            # comes from one vectorized pass over the filled ring.
+            self._pos_sum = float(self._pos_flows.sum())
+            self._neg_sum = float(self._neg_flows.sum())
+        else:
+            self._pos_sum += pos
+            self._neg_sum += neg
+
+        if self._count < self.period:
+            self.current_value = float("nan")
+        elif self._neg_bars > 0:
+            mfr = self._pos_sum / self._neg_sum
             self.current_value = 100.0 - (100.0 / (1.0 + mfr))
         else:
             self.current_value = 0.0
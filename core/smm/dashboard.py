@@ -13,45 +13,74 @@ class DashboardState:
     atr_period: int = 8
     mfi_period: int = 10
 
-    ema_fast: ExponentialMA = field(default_factory=lambda: ExponentialMA(8))
-    ema_slow: ExponentialMA = field(default_factory=lambda: ExponentialMA(21))
-    atr: AverageTrueRange = field(default_factory=lambda: AverageTrueRange(8))
-    mfi: MoneyFlowIndex = field(default_factory=lambda: MoneyFlowIndex(10))
+    # Built per instance from the *_period fields unless passed in explicitly
+    ema_fast: Optional[ExponentialMA] = None
+    ema_slow: Optional[ExponentialMA] = None
+    atr: Optional[AverageTrueRange] = None
+    mfi: Optional[MoneyFlowIndex] = None
     ha: HeikenAshiState = field(default_factory=HeikenAshiState)
 
     trend_switch: int = 1  # 1 bullish, -1 bearish
     background_trend: int = 0  # 1 bull, -1 bear, 0 neutral
     current_mode: EMode = EMode.None_
 
+    def __post_init__(self) -> None:
+        if self.ema_fast is None:
+            self.ema_fast = ExponentialMA(self.ema_fast_period)
+        if self.ema_slow is None:
+            self.ema_slow = ExponentialMA(self.ema_slow_period)
+        if self.atr is None:
+            self.atr = AverageTrueRange(self.atr_period)
+        if self.mfi is None:
+            self.mfi = MoneyFlowIndex(self.mfi_period)
+
 
 class DashboardEngine:
     def __init__(self, state: Optional[DashboardState] = None) -> None:
         self.s = state or DashboardState()
+        # Trailing ATR bands from the previous bar; None until the first bar
+        self._trend_up_prev: Optional[float] = None
+        self._trend_dn_prev: Optional[float] = None
 
     def on_bar(self, open_: float, high: float, low: float, close: float, volume: float, use_heiken_ashi: bool = True) -> None:
         if use_heiken_ashi:
-            ha_open, ha_high, ha_low, ha_close = update_heiken_ashi(self.s.ha, open_, high, low, close)
-            src_open, src_high, src_low, src_close = ha_open, ha_high, ha_low, ha_close
+            self.on_bar_ha(open_, high, low, close, volume)
         else:
-            src_open, src_high, src_low, src_close = open_, high, low, close
+            self.on_bar_raw(open_, high, low, close, volume)
+
+    def on_bar_ha(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """on_bar specialised for Heiken-Ashi source candles"""
+        _, src_high, src_low, src_close = update_heiken_ashi(self.s.ha, open_, high, low, close)
+        self._advance(close, src_high, src_low, src_close, volume)
+
+    def on_bar_raw(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """on_bar specialised for raw price candles"""
+        self._advance(close, high, low, close, volume)
 
+    def _advance(self, close: float, src_high: float, src_low: float, src_close: float, volume: float) -> None:
         ema_fast = self.s.ema_fast.update(src_close)
         ema_slow = self.s.ema_slow.update(src_close)
         _ = self.s.atr.update(src_high, src_low, src_close)
         _ = self.s.mfi.update(src_high, src_low, src_close, volume)
 
-        up = (src_high + src_low) / 2.0 - (1.3 * self.s.atr.previous_atr)
-        dn = (src_high + src_low) / 2.0 + (1.3 * self.s.atr.previous_atr)
+        mid = (src_high + src_low) * 0.5
+        band = 1.3 * self.s.atr.previous_atr
+        up = mid - band
+        dn = mid + band
 
-        prev_trend_up = getattr(self, "_trend_up_prev", up)
-        prev_trend_dn = getattr(self, "_trend_dn_prev", dn)
-        trend_up = max(up, prev_trend_up) if src_close > prev_trend_up else up
-        trend_dn = min(dn, prev_trend_dn) if src_close < prev_trend_dn else dn
-        self._trend_up_prev = trend_up
-        self._trend_dn_prev = trend_dn
+        prev_trend_up = self._trend_up_prev
+        prev_trend_dn = self._trend_dn_prev
+        if prev_trend_up is None:
+            prev_trend_up, prev_trend_dn = up, dn
+        self._trend_up_prev = max(up, prev_trend_up) if src_close > prev_trend_up else up
+        self._trend_dn_prev = min(dn, prev_trend_dn) if src_close < prev_trend_dn else dn
 
-        self.s.trend_switch = 1 if src_close > prev_trend_dn else (-1 if src_close < prev_trend_up else self.s.trend_switch)
-        self.s.background_trend = 1 if self.s.trend_switch == 1 else -1
+        s = self.s
+        if src_close > prev_trend_dn:
+            s.trend_switch = 1
+        elif src_close < prev_trend_up:
+            s.trend_switch = -1
+        s.background_trend = 1 if s.trend_switch == 1 else -1
 
         if self.s.current_mode == EMode.Buy and close < ema_slow and src_close < ema_slow:
             self.s.current_mode = EMode.None_
@@ -3,12 +3,38 @@ Enhanced SMM Strategy Implementation
 Implements DI+/DI- chop filter, delta surge detection, and debounce logic
 """
 
-import numpy as np
-import pandas as pd
-from typing import Optional, Dict, Any
+import logging
+from math import sqrt
+from typing import Optional, Dict, Any, NamedTuple
 from dataclasses import dataclass
 from collections import deque
 
+from .common import ExponentialMA, HeikenAshiState, update_heiken_ashi
+
+logger = logging.getLogger(__name__)
+
+
+def _di_kernel(prev_high: float, prev_low: float, prev_close: float,
+               high: float, low: float, close: float,
+               tr_s: float, pdm_s: float, mdm_s: float, alpha: float) -> tuple[float, float, float]:
+    """One Wilder step: return the updated (tr_s, pdm_s, mdm_s)
+
+    Plain float arguments only; alpha=1.0 seeds the smoothing with this bar.
+    """
+    # Calculate directional movement
+    up_move = high - prev_high
+    dn_move = prev_low - low
+    plus_dm = up_move if (up_move > dn_move and up_move > 0) else 0.0
+    minus_dm = dn_move if (dn_move > up_move and dn_move > 0) else 0.0
+    
+    # Calculate True Range
+    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    
+    # Wilder smoothing (EMA with alpha = 1/length)
+    return (tr_s + alpha * (tr - tr_s),
+            pdm_s + alpha * (plus_dm - pdm_s),
+            mdm_s + alpha * (minus_dm - mdm_s))
+
 
 @dataclass
 class EnhancedSignalConfig:
@@ -35,7 +61,17 @@ class EnhancedSignalConfig:
     atr_len: int = 14
 
 
-@dataclass
+class EnhancedBar(NamedTuple):
+    """One bar as stored in EnhancedSMMEngine.bars"""
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    delta: float
+
+
+@dataclass(slots=True, frozen=True)
 class EnhancedSignalResult:
     """Result of enhanced signal generation"""
     di_plus: float
@@ -60,6 +96,9 @@ class EnhancedSMMEngine:
         self.config = config
         self.bars = deque(maxlen=max(config.delta_lookback, config.profitwave_slow) + 10)
         self.delta_history = deque(maxlen=config.delta_lookback)
+        # Running sum / sum of squares over delta_history for O(1) z-scores
+        self._dx_sum = 0.0
+        self._dx_sum2 = 0.0
         
         # State tracking for debounce and cooldown
         self.long_confirmation_count = 0
@@ -68,6 +107,22 @@ class EnhancedSMMEngine:
         self.cooldown_short = 0
         self.last_signal_side = None
         
+        # Incremental Wilder DI state, advanced once per bar in add_bar
+        self._di_alpha = 1.0 / config.di_len
+        self._tr_s = 0.0
+        self._pdm_s = 0.0
+        self._mdm_s = 0.0
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self._bar_count = 0
+        
+        # Price-bias indicators, advanced once per bar in add_bar
+        self._ema3 = ExponentialMA(3)
+        self._ema_pwf = ExponentialMA(config.profitwave_fast)
+        self._ema_pws = ExponentialMA(config.profitwave_slow)
+        self._ha = HeikenAshiState()
+        
     def add_bar(self, open_price: float, high: float, low: float, close: float, 
                 volume: float, delta: Optional[float] = None, 
                 ask_vol: Optional[float] = None, bid_vol: Optional[float] = None):
@@ -79,87 +134,64 @@ class EnhancedSMMEngine:
             else:
                 delta = 0.0  # Fallback
         
-        bar = {
-            'open': open_price,
-            'high': high,
-            'low': low,
-            'close': close,
-            'volume': volume,
-            'delta': delta
-        }
-        
-        self.bars.append(bar)
-        self.delta_history.append(delta)
-        
-    def _calculate_di(self, bars: list) -> tuple[float, float]:
-        """Calculate DI+ and DI- using Wilder's method"""
-        if len(bars) < self.config.di_len:
-            return 0.0, 0.0
-        
-        # Convert to pandas for easier calculation
-        df = pd.DataFrame(bars)
-        
-        # Calculate directional movement
-        up_move = df['high'].diff()
-        dn_move = -df['low'].diff()
-        
-        plus_dm = ((up_move > dn_move) & (up_move > 0)).astype(float) * up_move.clip(lower=0.0)
-        minus_dm = ((dn_move > up_move) & (dn_move > 0)).astype(float) * dn_move.clip(lower=0.0)
-        
-        # Calculate True Range
-        tr = np.maximum(df['high'] - df['low'], 
-                       np.maximum((df['high'] - df['close'].shift()).abs(),
-                                 (df['low'] - df['close'].shift()).abs()))
-        
-        # Wilder smoothing (EMA with alpha = 1/length)
-        alpha = 1.0 / self.config.di_len
-        tr_smooth = tr.ewm(alpha=alpha, adjust=False).mean()
-        plus_dm_smooth = plus_dm.ewm(alpha=alpha, adjust=False).mean()
-        minus_dm_smooth = minus_dm.ewm(alpha=alpha, adjust=False).mean()
-        
-        # Calculate DI+ and DI-
-        di_plus = np.where(tr_smooth != 0, 100.0 * (plus_dm_smooth / tr_smooth), 0.0)
-        di_minus = np.where(tr_smooth != 0, 100.0 * (minus_dm_smooth / tr_smooth), 0.0)
-        
-        return float(di_plus[-1]), float(di_minus[-1])
-    
-    def _calculate_heiken_ashi(self, bars: list) -> tuple[float, float]:
-        """Calculate Heiken-Ashi close and open"""
-        if len(bars) < 2:
-            return bars[-1]['close'], bars[-1]['open']
-        
-        current = bars[-1]
-        previous = bars[-2]
-        
-        # HA Close = (O + H + L + C) / 4
-        ha_close = (current['open'] + current['high'] + current['low'] + current['close']) / 4
-        
-        # HA Open = (Previous HA Open + Previous HA Close) / 2
-        if len(bars) == 2:
-            ha_open = (previous['open'] + previous['close']) / 2
+        self.bars.append(EnhancedBar(open_price, high, low, close, volume, delta))
+        self._push_delta(delta)
+        self._bar_count += 1
+        self._update_di(high, low, close)
+        self._ema3.update(close)
+        self._ema_pwf.update(close)
+        self._ema_pws.update(close)
+        update_heiken_ashi(self._ha, open_price, high, low, close)
+        
+    def _push_delta(self, delta: float) -> None:
+        """Append to delta_history while keeping the running sums in step"""
+        history = self.delta_history
+        if len(history) == history.maxlen:
+            old = history[0]
+            self._dx_sum -= old
+            self._dx_sum2 -= old * old
+        history.append(delta)
+        if (self._bar_count & 4095) == 4095:
+            # Re-derive periodically so cancellation error cannot accumulate
+            self._dx_sum = float(sum(history))
+            self._dx_sum2 = float(sum(x * x for x in history))
         else:
-            # For simplicity, use regular open for first bar
-            ha_open = (previous['open'] + previous['close']) / 2
-        
-        return ha_close, ha_open
+            self._dx_sum += delta
+            self._dx_sum2 += delta * delta
     
-    def _calculate_ema(self, values: list, length: int) -> float:
-        """Calculate EMA for given values"""
-        if len(values) < length:
-            return values[-1] if values else 0.0
-        
-        series = pd.Series(values)
-        ema = series.ewm(span=length, adjust=False).mean()
-        return float(ema.iloc[-1])
+    def _update_di(self, high: float, low: float, close: float) -> None:
+        """Advance Wilder-smoothed TR and directional movement by one bar"""
+        if self._prev_close is not None:
+            # Seeded by the first bar that has a predecessor
+            alpha = 1.0 if self._bar_count == 2 else self._di_alpha
+            self._tr_s, self._pdm_s, self._mdm_s = _di_kernel(
+                self._prev_high, self._prev_low, self._prev_close, high, low, close,
+                self._tr_s, self._pdm_s, self._mdm_s, alpha,
+            )
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+    
+    def _calculate_di(self) -> tuple[float, float]:
+        """Current DI+ and DI- from the incrementally smoothed state (Wilder's method)"""
+        if self._bar_count < self.config.di_len or self._tr_s == 0:
+            return 0.0, 0.0
+        return 100.0 * self._pdm_s / self._tr_s, 100.0 * self._mdm_s / self._tr_s
+    
+    def _ema_value(self, ema: ExponentialMA, close: float) -> float:
+        """Current EMA, or the latest close until the EMA has seen a full period"""
+        if self._bar_count < ema.period:
+            return close
+        return ema.previous_ema
     
     def _calculate_delta_zscore(self, delta: float) -> float:
         """Calculate z-score for delta surge detection"""
         if len(self.delta_history) < self.config.delta_lookback // 2:
             return 0.0
         
-        values = list(self.delta_history)
-        mean = np.mean(values)
-        std = np.std(values, ddof=0)
+        n = len(self.delta_history)
+        mean = self._dx_sum / n
+        std = sqrt(max(self._dx_sum2 / n - mean * mean, 0.0))
         
         if std == 0:
             return 0.0
@@ -169,7 +201,9 @@ class EnhancedSMMEngine:
     def generate_signal(self) -> EnhancedSignalResult:
         """Generate enhanced signal based on current bar data"""
         if len(self.bars) < max(self.config.di_len, self.config.confirm_bars):
-            print(f"Enhanced SMM: Not ready, bars={len(self.bars)}, need={max(self.config.di_len, self.config.confirm_bars)}", flush=True)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Enhanced SMM: Not ready, bars=%d, need=%d",
+                             len(self.bars), max(self.config.di_len, self.config.confirm_bars))
             return EnhancedSignalResult(
                 di_plus=0.0, di_minus=0.0,
                 chop_long_gate=False, chop_short_gate=False,
@@ -181,41 +215,38 @@ class EnhancedSMMEngine:
             )
         
         current_bar = self.bars[-1]
-        delta = current_bar['delta']
+        delta = current_bar.delta
         
         # Calculate DI+ and DI-
-        di_plus, di_minus = self._calculate_di(list(self.bars))
+        di_plus, di_minus = self._calculate_di()
         
         # Chop filter gates - fixed logic
         chop_long_gate = (di_plus > di_minus) and (di_plus >= self.config.di_thresh)
         chop_short_gate = (di_minus > di_plus) and (di_minus >= self.config.di_thresh)
-        print(f"CHOP DEBUG: di_plus={di_plus:.1f}, di_minus={di_minus:.1f}, thresh={self.config.di_thresh}, long_gate={chop_long_gate}, short_gate={chop_short_gate}", flush=True)
         
         # Delta surge detection
         delta_z = self._calculate_delta_zscore(delta)
         delta_surge_long = delta_z >= self.config.delta_z
         delta_surge_short = delta_z <= -self.config.delta_z
-        print(f"DEBUG: delta_z={delta_z}, config.delta_z={self.config.delta_z}, surge_long={delta_surge_long}, surge_short={delta_surge_short}", flush=True)
         
         # Price bias (Heiken-Ashi and/or Profit-Wave) - RESTORED PROPER LOGIC
+        close = current_bar.close
         if self.config.use_heiken:
-            ha_close, ha_open = self._calculate_heiken_ashi(list(self.bars))
+            ha_close, ha_open = self._ha.close, self._ha.open
             price_bias_long = ha_close > ha_open
             price_bias_short = ha_close < ha_open
         else:
             # Light bias using EMA(3)
-            closes = [bar['close'] for bar in self.bars]
-            ema3 = self._calculate_ema(closes, 3)
-            price_bias_long = current_bar['close'] > ema3
-            price_bias_short = current_bar['close'] < ema3
+            ema3 = self._ema_value(self._ema3, close)
+            price_bias_long = close > ema3
+            price_bias_short = close < ema3
         
         if self.config.use_profitwave:
-            closes = [bar['close'] for bar in self.bars]
-            ema_fast = self._calculate_ema(closes, self.config.profitwave_fast)
-            ema_slow = self._calculate_ema(closes, self.config.profitwave_slow)
+            ema_fast = self._ema_value(self._ema_pwf, close)
+            ema_slow = self._ema_value(self._ema_pws, close)
             
-            price_bias_long = price_bias_long and (current_bar['close'] >= ema_fast) and (ema_fast >= ema_slow)
-            price_bias_short = price_bias_short and (current_bar['close'] <= ema_fast) and (ema_fast <= ema_slow)
+            price_bias_long = price_bias_long and (close >= ema_fast) and (ema_fast >= ema_slow)
+            price_bias_short = price_bias_short and (close <= ema_fast) and (ema_fast <= ema_slow)
         
         # Raw signal conditions
         long_raw = chop_long_gate and delta_surge_long and price_bias_long
@@ -265,12 +296,21 @@ class EnhancedSMMEngine:
             signal_side = "SELL"
             self.cooldown_long = self.config.cooldown
         
-        # Debug logging
-        if signal_side:
-            print(f"Enhanced SMM Signal: {signal_side} | DI+={di_plus:.1f}, DI-={di_minus:.1f} | delta_z={delta_z:.2f} | chop_long={chop_long_gate}, chop_short={chop_short_gate} | surge_long={delta_surge_long}, surge_short={delta_surge_short} | bias_long={price_bias_long}, bias_short={price_bias_short}", flush=True)
-        else:
-            # Debug why no signal
-            print(f"Enhanced SMM No Signal: DI+={di_plus:.1f}, DI-={di_minus:.1f} | delta_z={delta_z:.2f} | chop_long={chop_long_gate}, chop_short={chop_short_gate} | surge_long={delta_surge_long}, surge_short={delta_surge_short} | bias_long={price_bias_long}, bias_short={price_bias_short} | long_raw={long_raw}, short_raw={short_raw} | long_conf={long_confirmed}, short_conf={short_confirmed}", flush=True)
+        # Debug logging; formatting is skipped entirely unless DEBUG is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("CHOP: di_plus=%.1f, di_minus=%.1f, thresh=%s, long_gate=%s, short_gate=%s",
+                         di_plus, di_minus, self.config.di_thresh, chop_long_gate, chop_short_gate)
+            logger.debug("SURGE: delta_z=%s, config.delta_z=%s, surge_long=%s, surge_short=%s",
+                         delta_z, self.config.delta_z, delta_surge_long, delta_surge_short)
+            if signal_side:
+                logger.debug("Enhanced SMM Signal: %s | DI+=%.1f, DI-=%.1f | delta_z=%.2f | bias_long=%s, bias_short=%s",
+                             signal_side, di_plus, di_minus, delta_z, price_bias_long, price_bias_short)
+            else:
+                # Debug why no signal
+                logger.debug("Enhanced SMM No Signal: DI+=%.1f, DI-=%.1f | delta_z=%.2f | bias_long=%s, bias_short=%s | "
+                             "long_raw=%s, short_raw=%s | long_conf=%s, short_conf=%s",
+                             di_plus, di_minus, delta_z, price_bias_long, price_bias_short,
+                             long_raw, short_raw, long_confirmed, short_confirmed)
         
         return EnhancedSignalResult(
             di_plus=di_plus,
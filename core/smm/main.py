@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
+
 from core.features import FeatureSnapshot
 from core.signals import SignalDecision
 from .common import ExponentialMA, AverageTrueRange, MoneyFlowIndex, HeikenAshiState, update_heiken_ashi
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SMMDecision:
     side: Optional[str]
     delta_confidence: float
@@ -60,15 +63,28 @@ class SMMMainEngine:
         self.prev_low: Optional[float] = None
         self.prev_close: Optional[float] = None
 
+    @property
+    def delta_threshold(self) -> float:
+        return self._delta_threshold
+
+    @delta_threshold.setter
+    def delta_threshold(self, value: float) -> None:
+        self._delta_threshold = float(value)
+        # SELL side tests dc <= 1 - thr; keep the complement next to the threshold
+        self.delta_threshold_lo = 1.0 - self._delta_threshold
+
     def _di_approx(self, high: float, low: float, prev_high: float, prev_low: float) -> tuple[float, float]:
-        di_plus_calc = max(high - prev_high, 0.0) if (high - prev_high) > (prev_low - low) else 0.0
-        di_minus_calc = max(prev_low - low, 0.0) if (prev_low - low) > (high - prev_high) else 0.0
-        true_range = max(high - low, abs(high - (self.prev_close or high)), abs(low - (self.prev_close or low)))
+        up = high - prev_high
+        dn = prev_low - low
+        di_plus_calc = up if (up > dn and up > 0.0) else 0.0
+        di_minus_calc = dn if (dn > up and dn > 0.0) else 0.0
+        prev_close = self.prev_close
+        hi_ref = high if prev_close is None else prev_close
+        lo_ref = low if prev_close is None else prev_close
+        true_range = max(high - low, abs(high - hi_ref), abs(low - lo_ref))
         if true_range <= 0.0:
             return 0.0, 0.0
-        di_plus = 100.0 * (di_plus_calc / true_range)
-        di_minus = 100.0 * (di_minus_calc / true_range)
-        return di_plus, di_minus
+        return 100.0 * (di_plus_calc / true_range), 100.0 * (di_minus_calc / true_range)
 
     def on_bar(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
         if self.use_heiken_ashi:
@@ -78,27 +94,113 @@ class SMMMainEngine:
             src_o, src_h, src_l, src_c = open_, high, low, close
 
         # Update indicators
-        _ = self.ema8.update(src_c)
-        _ = self.ema13.update(src_c)
-        _ema21 = self.ema21.update(src_c)
-        _ema55 = self.ema55.update(src_c)  # Update EMA55 for trend filtering
-        _ = self.atr.update(src_h, src_l, src_c)
-        _ = self.mfi.update(src_h, src_l, src_c, volume)
+        self.ema8.update(src_c)
+        self.ema13.update(src_c)
+        self.ema21.update(src_c)
+        self.ema55.update(src_c)  # Update EMA55 for trend filtering
+        self.atr.update(src_h, src_l, src_c)
+        self.mfi.update(src_h, src_l, src_c, volume)
 
         # Maintain prev H/L/C for DI calc
-        if self.prev_high is None:
+        prev_high = self.prev_high
+        if prev_high is None:
             self.prev_high, self.prev_low, self.prev_close = src_h, src_l, src_c
             return
-        di_plus, di_minus = self._di_approx(src_h, src_l, self.prev_high, self.prev_low)
+        di_plus, di_minus = self._di_approx(src_h, src_l, prev_high, self.prev_low)
         # Stash for later evaluate use
         self._last_di_plus = di_plus
         self._last_di_minus = di_minus
         self.prev_high, self.prev_low, self.prev_close = src_h, src_l, src_c
 
+    def on_bars(self, open_, high, low, close, volume) -> None:
+        """Replay closed bars given as arrays; leaves the same state as on_bar per bar
+
+        Intended for warm-up and historical replay, where the per-bar indicator
+        dispatch of on_bar dominates.
+        """
+        o = np.asarray(open_, dtype=np.float64)
+        h = np.asarray(high, dtype=np.float64)
+        l = np.asarray(low, dtype=np.float64)
+        c = np.asarray(close, dtype=np.float64)
+        v = np.asarray(volume, dtype=np.float64)
+        n = len(c)
+        if n < 2:
+            for j in range(n):
+                self.on_bar(float(o[j]), float(h[j]), float(l[j]), float(c[j]), float(v[j]))
+            return
+
+        if self.use_heiken_ashi:
+            src_h, src_l, src_c = self._heiken_ashi_batch(o, h, l, c)
+        else:
+            src_h, src_l, src_c = h, l, c
+
+        # EMAs only need their terminal value
+        for ema in (self.ema8, self.ema13, self.ema21, self.ema55):
+            ema.previous_ema = _ewm_last(ema.previous_ema, src_c, ema.constant1)
+        self._atr_batch(src_h, src_l, src_c)
+
+        # MFI only depends on the last period+1 bars; replay just those
+        mfi = self.mfi
+        start = 0
+        if n > mfi.period + 1:
+            mfi = self.mfi = MoneyFlowIndex(mfi.period)
+            start = n - mfi.period - 1
+        for hh, ll, cc, vv in zip(src_h[start:].tolist(), src_l[start:].tolist(),
+                                  src_c[start:].tolist(), v[start:].tolist()):
+            mfi.update(hh, ll, cc, vv)
+
+        # DI is taken from the last two source bars, exactly as on_bar leaves it
+        self.prev_high, self.prev_low, self.prev_close = float(src_h[-2]), float(src_l[-2]), float(src_c[-2])
+        last_h, last_l, last_c = float(src_h[-1]), float(src_l[-1]), float(src_c[-1])
+        self._last_di_plus, self._last_di_minus = self._di_approx(last_h, last_l, self.prev_high, self.prev_low)
+        self.prev_high, self.prev_low, self.prev_close = last_h, last_l, last_c
+
+    def _heiken_ashi_batch(self, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray):
+        state = self.ha_state
+        ha_close = (o + h + l + c) * 0.25
+        fresh = state.open is None
+        seed = o[0] if fresh else (state.open + state.close) * 0.5
+        # ha_open[i] = (ha_open[i-1] + ha_close[i-1]) / 2, seeded by the first bar's open
+        ha_open = _ewm_path(None, np.concatenate(([seed], ha_close[:-1])), 0.5)
+        ha_high = np.maximum(h, ha_open)
+        ha_low = np.minimum(l, ha_open)
+        if fresh:
+            ha_high[0], ha_low[0] = h[0], l[0]
+        state.open, state.high, state.low, state.close = (
+            float(ha_open[-1]), float(ha_high[-1]), float(ha_low[-1]), float(ha_close[-1])
+        )
+        return ha_high, ha_low, ha_close
+
+    def _atr_batch(self, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> None:
+        atr = self.atr
+        # Warm-up bars average over a growing window; replay those one by one
+        k = max(0, min(len(c), atr.period - 1 - atr.sample_count))
+        if atr.previous_close is None:
+            k = max(k, 1)
+        for j in range(k):
+            atr.update(float(h[j]), float(l[j]), float(c[j]))
+        if k == len(c):
+            return
+        hh, ll, cc = h[k:], l[k:], c[k:]
+        pc = np.concatenate(([atr.previous_close], cc[:-1]))
+        true_range = np.maximum(np.abs(ll - pc), np.maximum(hh - ll, np.abs(hh - pc)))
+        # Steady state ((p - 1) * atr + tr) / p is an EMA with alpha = 1 / p
+        atr.previous_atr = _ewm_last(atr.previous_atr, true_range, 1.0 / atr.period)
+        atr.sample_count += len(cc)
+        atr.previous_close = float(cc[-1])
+
+    @staticmethod
+    def _peek(prev: float, c1: float, x: float) -> float:
+        """EMA value after one more sample x, without updating state"""
+        return prev + c1 * (x - prev)
+
     def evaluate(self, last_price: float, features: FeatureSnapshot) -> SMMDecision:
-        # Use last known indicator states; update EMAs with last price for slope
-        ema21_val = self.ema21.update(last_price)
-        ema21_slope = self.ema21.constant1 * (last_price - ema21_val)
+        # Use last known indicator states; peek EMA21 one step ahead at the last price
+        # for slope without folding an intrabar price into the bar-close EMA
+        ema21 = self.ema21
+        prev21 = ema21.previous_ema
+        ema21_val = last_price if prev21 is None else self._peek(prev21, ema21.constant1, last_price)
+        ema21_slope = ema21.constant1 * (last_price - ema21_val)
 
         ema8_val = self.ema8.previous_ema if self.ema8.previous_ema is not None else last_price
         ema13_val = self.ema13.previous_ema if self.ema13.previous_ema is not None else last_price
@@ -111,46 +213,18 @@ class SMMMainEngine:
         src_open = self.ha_state.open if (self.use_heiken_ashi and self.ha_state.open is not None) else last_price
         src_low = self.ha_state.low if (self.use_heiken_ashi and self.ha_state.low is not None) else last_price
         src_high = self.ha_state.high if (self.use_heiken_ashi and self.ha_state.high is not None) else last_price
-        strong_bull = (last_price > src_open) and (src_open == src_low) and (last_price > ema8_val) and (last_price > ema21_val)
-        strong_bear = (last_price < src_open) and (src_open == src_high) and (last_price < ema8_val) and (last_price < ema21_val)
-
-        # EMA55 trend filtering (matches NinjaTrader SMM)
-        ema55_slope = self.ema55.constant1 * (last_price - ema55_val)
-        trend_bullish = last_price > ema21_val and ema21_slope >= 0.0 and last_price > ema55_val and ema55_slope >= 0.0
-        trend_bearish = last_price < ema21_val and ema21_slope <= 0.0 and last_price < ema55_val and ema55_slope <= 0.0
-        
-        allow_long = trend_bullish
-        allow_short = trend_bearish
-
-        # Chop filter via DI and MFI thresholds (close to C# logic)
-        can_buy = (di_plus > di_minus and di_plus >= 45.0)
-        can_sell = (di_minus > di_plus and di_minus >= 45.0)
-        mfi_buy = (mfi_val > 52.0) if mfi_val == mfi_val else True  # NaN-safe
-        mfi_sell = (mfi_val < 48.0) if mfi_val == mfi_val else True
-
-        # Optional MA filter: price above/below EMA13 (as a proxy for C# configurable MA)
-        ma_buy_ok = True
-        ma_sell_ok = True
-        if self.use_ma_filter:
-            ma_buy_ok = last_price > ema13_val
-            ma_sell_ok = last_price < ema13_val
-
-        side: Optional[str] = None
-        reason = "hold"
-
-        # Primary SMM signal conditions
-        buy_con = allow_long and strong_bull and can_buy and mfi_buy and ma_buy_ok
-        sell_con = allow_short and strong_bear and can_sell and mfi_sell and ma_sell_ok
-
-        # Add delta confirmation
-        if buy_con and features.delta_confidence >= self.delta_threshold:
-            side, reason = "BUY", "SMM+delta>=thr"
-        elif sell_con and (1.0 - features.delta_confidence) >= self.delta_threshold:
-            side, reason = "SELL", "SMM+delta<=1-thr"
+
+        dc = features.delta_confidence
+        side_code, ema55_slope, trend_bullish, trend_bearish, strong_bull, strong_bear = _evaluate_core(
+            last_price, ema8_val, ema13_val, ema21_val, ema21_slope, ema55_val, self.ema55.constant1,
+            src_open, src_low, src_high, di_plus, di_minus, mfi_val, self.use_ma_filter,
+            dc, self._delta_threshold, self.delta_threshold_lo,
+        )
+        side, reason = _SIDE_REASONS[side_code]
 
         return SMMDecision(
             side=side,
-            delta_confidence=features.delta_confidence,
+            delta_confidence=dc,
             ema21=ema21_val,
             ema21_slope=ema21_slope,
             reason=reason,
@@ -166,3 +240,68 @@ class SMMMainEngine:
             strong_bull=strong_bull,
             strong_bear=strong_bear,
         )
+
+
+# side_code from _evaluate_core -> (side, reason)
+_SIDE_REASONS = {
+    0: (None, "hold"),
+    1: ("BUY", "SMM+delta>=thr"),
+    -1: ("SELL", "SMM+delta<=1-thr"),
+}
+
+
+def _evaluate_core(last_price: float, ema8_val: float, ema13_val: float, ema21_val: float, ema21_slope: float,
+                   ema55_val: float, ema55_c1: float, src_open: float, src_low: float, src_high: float,
+                   di_plus: float, di_minus: float, mfi_val: float, use_ma_filter: bool,
+                   delta_conf: float, delta_thr: float, delta_thr_lo: float) -> tuple:
+    """Condition block of SMMMainEngine.evaluate over plain scalars
+
+    Returns (side_code, ema55_slope, trend_bullish, trend_bearish, strong_bull, strong_bear)
+    with side_code 1 BUY, -1 SELL, 0 hold.
+    """
+    strong_bull = (last_price > src_open) and (src_open == src_low) and (last_price > ema8_val) and (last_price > ema21_val)
+    strong_bear = (last_price < src_open) and (src_open == src_high) and (last_price < ema8_val) and (last_price < ema21_val)
+
+    # EMA55 trend filtering (matches NinjaTrader SMM)
+    ema55_slope = ema55_c1 * (last_price - ema55_val)
+    trend_bullish = last_price > ema21_val and ema21_slope >= 0.0 and last_price > ema55_val and ema55_slope >= 0.0
+    trend_bearish = last_price < ema21_val and ema21_slope <= 0.0 and last_price < ema55_val and ema55_slope <= 0.0
+
+    # Chop filter via DI and MFI thresholds (close to C# logic)
+    can_buy = (di_plus > di_minus and di_plus >= 45.0)
+    can_sell = (di_minus > di_plus and di_minus >= 45.0)
+    mfi_nan = math.isnan(mfi_val)  # warm-up: MFI does not gate
+    mfi_buy = True if mfi_nan else mfi_val > 52.0
+    mfi_sell = True if mfi_nan else mfi_val < 48.0
+
+    # Optional MA filter: price above/below EMA13 (as a proxy for C# configurable MA)
+    ma_buy_ok = (not use_ma_filter) or last_price > ema13_val
+    ma_sell_ok = (not use_ma_filter) or last_price < ema13_val
+
+    # Primary SMM signal conditions plus delta confirmation. The two sides are
+    # mutually exclusive (price is above or below EMA21), so BUY - SELL indexes _SIDE_REASONS
+    buy_ok = trend_bullish and strong_bull and can_buy and mfi_buy and ma_buy_ok and delta_conf >= delta_thr
+    sell_ok = trend_bearish and strong_bear and can_sell and mfi_sell and ma_sell_ok and delta_conf <= delta_thr_lo
+    side_code = int(buy_ok) - int(sell_ok)
+    return side_code, ema55_slope, trend_bullish, trend_bearish, strong_bull, strong_bear
+
+def _ewm_last(seed: Optional[float], x: np.ndarray, alpha: float) -> float:
+    """Final value of y = y + alpha * (x - y) over x, as one weighted sum instead of a recursion"""
+    if seed is None:
+        seed, x = float(x[0]), x[1:]
+    n = len(x)
+    if n == 0:
+        return float(seed)
+    decay = 1.0 - alpha
+    # x[i] enters with weight alpha * decay**(n-1-i); old weights underflow harmlessly to 0
+    weights = alpha * decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    return float(decay ** n * seed + weights @ x)
+
+
+def _ewm_path(seed: Optional[float], x: np.ndarray, alpha: float) -> np.ndarray:
+    """Every value of y = y + alpha * (x - y) over x; without a seed y starts at x[0]"""
+    import pandas as pd  # replay-only path; keeps pandas out of live imports
+
+    if seed is None:
+        return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate(([seed], x))).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
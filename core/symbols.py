@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, Tuple
 
 
 _QUARTER_CODES = {1: "H", 2: "M", 3: "U", 4: "Z"}
+# (root, year, quarter) -> resolved pair; only changes at quarter boundaries
+_FRONT_MONTH_CACHE: Dict[Tuple[str, int, int], Tuple[str, str]] = {}
 
 
 def _quarter_of_month(month: int) -> int:
@@ -20,10 +22,15 @@ def resolve_front_month(symbol_root: str, now: datetime | None = None) -> Tuple[
     Returns a tuple of (front_root_symbol, front_symbol), e.g., ('NQ', 'NQZ5').
     """
     now = now or datetime.utcnow()
-    q = _quarter_of_month(now.month)
-    code = _QUARTER_CODES[q]
+    key = (symbol_root, now.year, _quarter_of_month(now.month))
+    hit = _FRONT_MONTH_CACHE.get(key)
+    if hit is not None:
+        return hit
+    code = _QUARTER_CODES[key[2]]
     year_digit = str(now.year)[-1]
-    return symbol_root, f"{symbol_root}{code}{year_digit}"
+    res = (symbol_root, f"{symbol_root}{code}{year_digit}")
+    _FRONT_MONTH_CACHE[key] = res
+    return res
 
 
 
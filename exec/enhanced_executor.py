@@ -1,24 +1,40 @@
+import asyncio
 import os
-import uuid
+import copy
+import functools
+import logging
 import time
 import pytz
 from datetime import datetime, time as dt_time
 from dataclasses import dataclass
-from typing import Optional, Dict, List
-from collections import deque
+from typing import Any, Optional, Dict, List
 import yaml
 import json
 from pathlib import Path
 
-from async_rithmic.enums import TransactionType, OrderType, OrderDuration
-from exec.executor import ExecutionEngine, OrderIntent
+import numpy as np
 
+from exec.executor import ExecutionEngine, OrderIntent, _OD_DAY, _OT_MARKET, _TX_BUY, _TX_SELL
 
-@dataclass
+
+# Codes returned by check_exit_conditions_batch; index 0 means no exit
+EXIT_REASONS = (None, "time_exit", "early_profit", "breakeven_activated", "momentum_exit")
+_INITIAL_POSITION_SLOTS = 1024
+logger = logging.getLogger(__name__)
+# Sizing diagnostics are logged at DEBUG; SMM_DEBUG=1 enables them for this module
+if bool(int(os.getenv("SMM_DEBUG", "0"))):
+    logger.setLevel(logging.DEBUG)
+CONFIG_PATH = "config/config.yaml"
+# libyaml's loader when PyYAML was built with it; same semantics as SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@dataclass(slots=True)
 class EnhancedOrderIntent(OrderIntent):
     """Enhanced order intent with additional strategy parameters"""
     entry_time: float
     max_hold_time: float
+    entry_price: float = 0.0
     breakeven_price: Optional[float] = None
     trail_price: Optional[float] = None
     momentum_exit_threshold: float = 0.3
@@ -32,29 +48,45 @@ class EnhancedExecutionEngine(ExecutionEngine):
     def __init__(self) -> None:
         super().__init__()
         self.config = self._load_config()
-        self.test_accounts = set(self.config.get("strategy", {}).get("test_accounts", []))
-        self.trading_window_enabled = self.config.get("strategy", {}).get("trading_window", {}).get("enabled", False)
-        self.trading_start_time = self.config.get("strategy", {}).get("trading_window", {}).get("start_time", "09:30")
-        self.trading_end_time = self.config.get("strategy", {}).get("trading_window", {}).get("end_time", "10:00")
-        self.timezone = pytz.timezone(self.config.get("strategy", {}).get("trading_window", {}).get("timezone", "America/New_York"))
+        strategy = self.config.get("strategy") or {}
+        window = strategy.get("trading_window") or {}
+        self.test_accounts = set(strategy.get("test_accounts") or [])
+        self.trading_window_enabled = window.get("enabled", False)
+        self.trading_start_time = window.get("start_time", "09:30")
+        self.trading_end_time = window.get("end_time", "10:00")
+        self.timezone = pytz.timezone(window.get("timezone", "America/New_York"))
+        # Window bounds as local seconds-of-day, parsed once; None disables the check
+        try:
+            self._win_start_sec: Optional[float] = self._seconds_of_day(dt_time.fromisoformat(self.trading_start_time))
+            self._win_end_sec: Optional[float] = self._seconds_of_day(dt_time.fromisoformat(self.trading_end_time))
+        except Exception:
+            self._win_start_sec = self._win_end_sec = None
+        # UTC offset of self.timezone, refreshed on each UTC hour so DST changes are picked up
+        self._tz_offset_sec = 0.0
+        self._tz_refresh_at = 0.0
         
         # Position sizing parameters
-        self.position_config = self.config.get("strategy", {}).get("position_sizing", {})
+        self.position_config = strategy.get("position_sizing") or {}
         self.base_size = self.position_config.get("base_size", 1)
         self.max_size = self.position_config.get("max_size", 2)
         self.volatility_adjustment = self.position_config.get("volatility_adjustment", True)
         self.confidence_multiplier = self.position_config.get("confidence_multiplier", True)
         
         # Bracket parameters
-        self.bracket_config = self.config.get("strategy", {}).get("bracket", {})
+        self.bracket_config = strategy.get("bracket") or {}
         self.target_ticks = self.bracket_config.get("target_ticks", 16)
         self.stop_ticks = self.bracket_config.get("stop_ticks", 8)
         self.dynamic_sizing = self.bracket_config.get("dynamic_sizing", True)
         self.atr_multiplier_target = self.bracket_config.get("atr_multiplier_target", 1.5)
         self.atr_multiplier_stop = self.bracket_config.get("atr_multiplier_stop", 0.8)
+        self.use_signal_targets = self.bracket_config.get("use_signal_targets", True)
+        self.target_multiplier = self.bracket_config.get("target_multiplier", 1.5)
+        self.stop_multiplier = self.bracket_config.get("stop_multiplier", 0.8)
+        self.fallback_target_ticks = self.bracket_config.get("fallback_target_ticks", 16)
+        self.fallback_stop_ticks = self.bracket_config.get("fallback_stop_ticks", 8)
         
         # Exit strategy parameters
-        self.exit_config = self.config.get("strategy", {}).get("exit_strategy", {})
+        self.exit_config = strategy.get("exit_strategy") or {}
         self.time_based_exit = self.exit_config.get("time_based_exit", True)
         self.max_hold_minutes = self.exit_config.get("max_hold_minutes", 15)
         self.profit_target_early = self.exit_config.get("profit_target_early", 8)
@@ -65,38 +97,84 @@ class EnhancedExecutionEngine(ExecutionEngine):
         # Track active positions for exit management
         self.active_positions: Dict[str, EnhancedOrderIntent] = {}
         self.position_entry_times: Dict[str, float] = {}
+        # Column copies of the numeric exit fields, one slot per active position in
+        # insertion order, so bulk exit checks are vectorised comparisons
+        self._pos_ids: List[str] = []
+        self._pos_index: Dict[str, int] = {}
+        self._pos_entry_time = np.empty(_INITIAL_POSITION_SLOTS, dtype=np.float64)
+        self._pos_max_hold_time = np.empty(_INITIAL_POSITION_SLOTS, dtype=np.float64)
+        self._pos_momentum = np.empty(_INITIAL_POSITION_SLOTS, dtype=np.float64)
+        self._pos_breakeven_set = np.empty(_INITIAL_POSITION_SLOTS, dtype=np.bool_)
         
+    def _track_position(self, intent: EnhancedOrderIntent) -> None:
+        """Register an active position in both the dict and the exit columns"""
+        coid = intent.client_order_id
+        self.active_positions[coid] = intent
+        self.position_entry_times[coid] = intent.entry_time
+        n = len(self._pos_ids)
+        if n == len(self._pos_entry_time):
+            for name in ("_pos_entry_time", "_pos_max_hold_time", "_pos_momentum", "_pos_breakeven_set"):
+                col = getattr(self, name)
+                grown = np.empty(2 * n, dtype=col.dtype)
+                grown[:n] = col
+                setattr(self, name, grown)
+        self._pos_ids.append(coid)
+        self._pos_index[coid] = n
+        self._pos_entry_time[n] = intent.entry_time
+        self._pos_max_hold_time[n] = intent.max_hold_time
+        self._pos_momentum[n] = intent.momentum_exit_threshold
+        self._pos_breakeven_set[n] = intent.breakeven_price is not None
+
     def _load_config(self) -> dict:
         """Load configuration from config.yaml"""
         try:
-            with open("config/config.yaml", "r") as f:
-                return yaml.safe_load(f) or {}
+            parsed = self._load_config_cached(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns)
         except Exception:
             return {}
+        # Each engine gets its own copy so the cached parse cannot be mutated through it
+        return copy.deepcopy(parsed)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _load_config_cached(path: str, mtime_ns: int) -> dict:
+        """Parse a YAML config once per (path, mtime)"""
+        with open(path, "r") as f:
+            return yaml.load(f, Loader=_YAML_LOADER) or {}
     
     def _is_trading_window_active(self) -> bool:
         """Check if current time is within the trading window"""
         if not self.trading_window_enabled:
             return True
             
+        if self._win_start_sec is None:
+            return True  # Default to allowing trading if the window cannot be parsed
         try:
-            now = datetime.now(self.timezone).time()
-            start_time = dt_time.fromisoformat(self.trading_start_time)
-            end_time = dt_time.fromisoformat(self.trading_end_time)
-            return start_time <= now <= end_time
+            now = time.time()
+            if now >= self._tz_refresh_at:
+                self._tz_offset_sec = datetime.now(self.timezone).utcoffset().total_seconds()
+                self._tz_refresh_at = (now // 3600 + 1) * 3600
+            sec_of_day = (now + self._tz_offset_sec) % 86400
+            return self._win_start_sec <= sec_of_day <= self._win_end_sec
         except Exception:
             return True  # Default to allowing trading if time check fails
     
+    @staticmethod
+    def _seconds_of_day(t: dt_time) -> float:
+        return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+    
     def _calculate_position_size(self, account_id: str, confidence_score: float, atr_value: float, current_price: float) -> int:
         """Calculate optimal position size based on confidence, volatility, and risk parameters"""
         # Only gate by test_accounts if a filter is configured
         if self.test_accounts and account_id not in self.test_accounts:
-            try:
-                print(f"QTY DEBUG: account {account_id} not in test_accounts (filter active) => size=0", flush=True)
-            except Exception:
-                pass
+            logger.debug("QTY DEBUG: account %s not in test_accounts (filter active) => size=0", account_id)
             return 0
-            
+        qty = self._compute_common_qty(confidence_score, atr_value, current_price)
+        logger.debug("QTY DEBUG: account=%s qty=%s base=%s conf=%.3f atr=%.5f",
+                     account_id, qty, self.base_size, confidence_score, atr_value)
+        return qty
+    
+    def _compute_common_qty(self, confidence_score: float, atr_value: float, current_price: float) -> int:
+        """Account-independent part of the position size; identical for every account of a signal"""
         base_size = self.base_size
         
         # Confidence multiplier (scale with delta confidence)
@@ -110,21 +188,14 @@ class EnhancedExecutionEngine(ExecutionEngine):
             base_size = int(base_size * volatility_factor)
         
         # Ensure within bounds
-        qty = max(1, min(base_size, self.max_size))
-        try:
-            print(f"QTY DEBUG: account={account_id} qty={qty} base={self.base_size} conf={confidence_score:.3f} atr={atr_value:.5f}", flush=True)
-        except Exception:
-            pass
-        return qty
+        return max(1, min(base_size, self.max_size))
     
     def _calculate_bracket_levels(self, entry_price: float, side: str, atr_value: float, signal_price: Optional[float] = None) -> tuple[int, int]:
         """Calculate dynamic bracket levels based on SMM signal prices or ATR"""
-        use_signal_targets = self.bracket_config.get("use_signal_targets", True)
-        
-        if use_signal_targets and signal_price is not None:
+        if self.use_signal_targets and signal_price is not None:
             # Use SMM signal-based targets (matches NinjaTrader approach)
-            target_multiplier = self.bracket_config.get("target_multiplier", 1.5)
-            stop_multiplier = self.bracket_config.get("stop_multiplier", 0.8)
+            target_multiplier = self.target_multiplier
+            stop_multiplier = self.stop_multiplier
             
             if side.upper() == "BUY":
                 target_price = signal_price * target_multiplier
@@ -142,8 +213,8 @@ class EnhancedExecutionEngine(ExecutionEngine):
             stop_ticks = max(4, int(atr_value * self.atr_multiplier_stop / 0.25))
         else:
             # Use fallback fixed sizing
-            target_ticks = self.bracket_config.get("fallback_target_ticks", 16)
-            stop_ticks = self.bracket_config.get("fallback_stop_ticks", 8)
+            target_ticks = self.fallback_target_ticks
+            stop_ticks = self.fallback_stop_ticks
             
         return target_ticks, stop_ticks
     
@@ -160,7 +231,7 @@ class EnhancedExecutionEngine(ExecutionEngine):
         # Use parent validation
         return super()._should_allow_order(account_id, side, qty)
     
-    async def submit_enhanced_signal(
+    def _prepare_enhanced_signal(
         self, 
         symbol: str, 
         side: str, 
@@ -170,78 +241,86 @@ class EnhancedExecutionEngine(ExecutionEngine):
         accounts: List[str],
         signal_price: Optional[float] = None,
         exchange: Optional[str] = None
-    ) -> List[EnhancedOrderIntent]:
-        """Submit signal with enhanced position sizing and bracket optimization"""
+    ) -> tuple[List[EnhancedOrderIntent], list, Optional[Exception]]:
+        """Size, gate and record a signal's intents
+
+        Returns the intents, their pending live submissions and the error that stopped
+        the account loop, if any.
+        """
         intents: List[EnhancedOrderIntent] = []
-        try:
-            print(f"ENHANCED SUBMIT: symbol={symbol} side={side} accounts={accounts}", flush=True)
-        except Exception:
-            pass
+        submits = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("ENHANCED SUBMIT: symbol=%s side=%s accounts=%s", symbol, side, accounts)
+        
+        test_accounts = self.test_accounts
+        plant = self.order_plant
+        live = self.trading_enabled and plant is not None
+        common_qty: Optional[int] = None
         
-        for acc in accounts:
-            if not self.account_enabled.get(acc, False):
-                try:
-                    print(f"SUBMIT SKIP: account {acc} not enabled", flush=True)
-                except Exception:
-                    pass
-                continue
+        # An error part-way through the accounts keeps what was already recorded, so the
+        # caller still sends those orders (as the sequential submit did) before raising
+        error: Optional[Exception] = None
+        try:
+            for acc in accounts:
+                if not self.account_enabled.get(acc, False):
+                    logger.info("SUBMIT SKIP: account %s not enabled", acc)
+                    continue
                 
-            # Calculate optimal position size
-            qty = self._calculate_position_size(acc, confidence_score, atr_value, current_price)
-            if qty <= 0:
-                try:
-                    print(f"SUBMIT SKIP: account {acc} qty<=0", flush=True)
-                except Exception:
-                    pass
-                continue
+                if common_qty is None:
+                    # Size and brackets depend only on the signal: compute them once, on the
+                    # first enabled account, so a signal no account takes does no work
+                    common_qty = self._compute_common_qty(confidence_score, atr_value, current_price)
+                    target_ticks, stop_ticks = self._calculate_bracket_levels(current_price, side, atr_value, signal_price)
+                    if live:
+                        tx = _TX_BUY if side.upper() == "BUY" else _TX_SELL
+                        ot = _OT_MARKET
+                        ex = exchange or self.default_exchange or "CME"
                 
-            # Calculate dynamic bracket levels using SMM signal price
-            target_ticks, stop_ticks = self._calculate_bracket_levels(current_price, side, atr_value, signal_price)
-            
-            # Check if order should be allowed
-            allow, reason = self._should_allow_order(acc, side, qty)
-            if not allow:
-                try:
-                    print(f"SUBMIT SKIP: account {acc} not allowed reason={reason}", flush=True)
-                except Exception:
-                    pass
-                continue
+                # Only gate by test_accounts if a filter is configured
+                qty = 0 if (test_accounts and acc not in test_accounts) else common_qty
+                if debug:
+                    logger.debug("QTY DEBUG: account=%s qty=%s base=%s conf=%.3f atr=%.5f",
+                                 acc, qty, self.base_size, confidence_score, atr_value)
+                if qty <= 0:
+                    logger.info("SUBMIT SKIP: account %s qty<=0", acc)
+                    continue
+                
+                # Check if order should be allowed
+                allow, reason = self._should_allow_order(acc, side, qty)
+                if not allow:
+                    logger.info("SUBMIT SKIP: account %s not allowed reason=%s", acc, reason)
+                    continue
                 
-            coid = self._new_client_order_id(acc)
-            entry_time = time.time()
-            max_hold_time = entry_time + (self.max_hold_minutes * 60)
+                coid = self._new_client_order_id(acc)
+                entry_time = time.time()
+                max_hold_time = entry_time + (self.max_hold_minutes * 60)
             
-            intent = EnhancedOrderIntent(
-                account_id=acc,
-                symbol=symbol,
-                side=side,
-                qty=qty,
-                client_order_id=coid,
-                target_ticks=target_ticks,
-                stop_ticks=stop_ticks,
-                entry_time=entry_time,
-                max_hold_time=max_hold_time,
-                atr_value=atr_value,
-                confidence_score=confidence_score
-            )
+                intent = EnhancedOrderIntent(
+                    account_id=acc,
+                    symbol=symbol,
+                    side=side,
+                    qty=qty,
+                    client_order_id=coid,
+                    target_ticks=target_ticks,
+                    stop_ticks=stop_ticks,
+                    entry_time=entry_time,
+                    entry_price=current_price,
+                    max_hold_time=max_hold_time,
+                    atr_value=atr_value,
+                    confidence_score=confidence_score
+                )
             
-            self.open_orders[acc][coid] = intent
-            self.active_positions[coid] = intent
-            self.position_entry_times[coid] = entry_time
-            intents.append(intent)
-            self._record_order_time(acc)
+                self.open_orders[acc][coid] = intent
+                self._track_position(intent)
+                intents.append(intent)
+                self._record_order_time(acc)
             
-            # Submit live order if enabled
-            if self.trading_enabled and self.order_plant is not None and acc in self.whitelist:
-                try:
-                    print(f"LIVE SUBMIT: acc={acc} coid={coid} qty={qty} target={target_ticks} stop={stop_ticks} exch={exchange or self.default_exchange}", flush=True)
-                except Exception:
-                    pass
-                try:
-                    tx = TransactionType.BUY if side.upper() == "BUY" else TransactionType.SELL
-                    ot = OrderType.MARKET
-                    ex = exchange or self.default_exchange or "CME"
-                    await self.order_plant.submit_order(
+                # Submit live order if enabled
+                if live and acc in self.whitelist:
+                    logger.info("LIVE SUBMIT: acc=%s coid=%s qty=%s target=%s stop=%s exch=%s",
+                                acc, coid, qty, target_ticks, stop_ticks, ex)
+                    submits.append(plant.submit_order(
                         order_id=coid,
                         symbol=symbol,
                         exchange=ex,
@@ -251,22 +330,74 @@ class EnhancedExecutionEngine(ExecutionEngine):
                         account_id=acc,
                         target_ticks=target_ticks,
                         stop_ticks=stop_ticks,
-                        duration=OrderDuration.DAY
-                    )
-                except Exception:
-                    pass
-            else:
-                try:
-                    print(f"LIVE SUBMIT SKIP: acc={acc} trading_enabled={self.trading_enabled} plant={self.order_plant is not None} whitelisted={acc in self.whitelist}", flush=True)
-                except Exception:
-                    pass
+                        duration=_OD_DAY
+                    ))
+                else:
+                    logger.info("LIVE SUBMIT SKIP: acc=%s trading_enabled=%s plant=%s whitelisted=%s",
+                                acc, self.trading_enabled, plant is not None, acc in self.whitelist)
+        except Exception as e:
+            error = e
                     
+        return intents, submits, error
+    
+    async def submit_enhanced_signal(
+        self, 
+        symbol: str, 
+        side: str, 
+        confidence_score: float,
+        atr_value: float,
+        current_price: float,
+        accounts: List[str],
+        signal_price: Optional[float] = None,
+        exchange: Optional[str] = None
+    ) -> List[EnhancedOrderIntent]:
+        """Submit signal with enhanced position sizing and bracket optimization"""
+        intents, submits, error = self._prepare_enhanced_signal(
+            symbol, side, confidence_score, atr_value, current_price, accounts, signal_price, exchange
+        )
+        if submits:
+            # A failed submit must not affect the other accounts
+            await asyncio.gather(*submits, return_exceptions=True)
+        if error is not None:
+            raise error
         return intents
     
+    async def submit_enhanced_signal_batch(
+        self, signals: List[Dict[str, Any]], return_exceptions: bool = False
+    ) -> List[Any]:
+        """Submit several signals in one call; each entry holds submit_enhanced_signal kwargs.
+        Returns the intents generated for each signal, in order. Signals are gated in
+        order, then every live order of the batch is sent in one concurrent round.
+
+        A signal that fails only affects itself: the others' orders are still sent.
+        With return_exceptions its slot holds the exception, otherwise the first
+        error is raised after the round has been sent.
+        """
+        results: List[Any] = []
+        submits = []
+        first_error: Optional[Exception] = None
+        for signal in signals:
+            try:
+                intents, pending, error = self._prepare_enhanced_signal(**signal)
+            except Exception as e:
+                intents, pending, error = None, [], e
+            submits.extend(pending)
+            if error is not None:
+                first_error = first_error or error
+                results.append(error)
+            else:
+                results.append(intents)
+        if submits:
+            await asyncio.gather(*submits, return_exceptions=True)
+        if first_error is not None and not return_exceptions:
+            raise first_error
+        return results
+    
     def update_position_momentum(self, client_order_id: str, momentum_score: float) -> None:
         """Update momentum score for position exit decisions"""
         if client_order_id in self.active_positions:
             self.active_positions[client_order_id].momentum_exit_threshold = momentum_score
+            self._pos_momentum[self._pos_index[client_order_id]] = momentum_score
     
     def check_exit_conditions(self, client_order_id: str, current_price: float, unrealized_pnl: float) -> Optional[str]:
         """Check if position should be exited based on various conditions"""
@@ -286,7 +417,8 @@ class EnhancedExecutionEngine(ExecutionEngine):
             
         # Breakeven activation
         if intent.breakeven_price is None and unrealized_pnl >= self.breakeven_activation * 0.25:
-            intent.breakeven_price = intent.entry_time  # Set breakeven at entry
+            intent.breakeven_price = intent.entry_price  # Set breakeven at entry
+            self._pos_breakeven_set[self._pos_index[client_order_id]] = True
             return "breakeven_activated"
             
         # Momentum-based exit
@@ -295,27 +427,58 @@ class EnhancedExecutionEngine(ExecutionEngine):
             
         return None
     
+    def check_exit_conditions_batch(self, unrealized_pnls: np.ndarray) -> np.ndarray:
+        """check_exit_conditions for every active position at once
+
+        unrealized_pnls is aligned with active_positions insertion order. Returns an
+        int8 array of indices into EXIT_REASONS; breakeven activations are applied
+        to the intents exactly as in the per-position check.
+        """
+        n = len(self._pos_ids)
+        pnl = np.asarray(unrealized_pnls, dtype=np.float64)
+        codes = np.zeros(n, dtype=np.int8)
+        if n == 0:
+            return codes
+        current_time = time.time()
+        breakeven_set = self._pos_breakeven_set[:n]
+
+        # Assign in reverse priority so earlier conditions win, as in the scalar checks
+        if self.momentum_exit:
+            codes[self._pos_momentum[:n] < self.momentum_threshold] = 4
+        activate = ~breakeven_set & (pnl >= self.breakeven_activation * 0.25)
+        codes[activate] = 3
+        codes[pnl >= self.profit_target_early * 0.25] = 2
+        if self.time_based_exit:
+            codes[current_time >= self._pos_max_hold_time[:n]] = 1
+
+        for idx in np.flatnonzero(codes == 3).tolist():
+            intent = self.active_positions[self._pos_ids[idx]]
+            intent.breakeven_price = intent.entry_price  # Set breakeven at entry
+            breakeven_set[idx] = True
+        return codes
+    
     def get_active_positions_summary(self) -> Dict[str, dict]:
         """Get summary of all active positions for monitoring"""
-        summary = {}
-        current_time = time.time()
-        
-        for coid, intent in self.active_positions.items():
-            time_in_position = current_time - intent.entry_time
-            summary[coid] = {
+        n = len(self._pos_ids)
+        minutes_in_position = ((time.time() - self._pos_entry_time[:n]) / 60).tolist()
+        active = self.active_positions
+        return {
+            coid: {
                 "account_id": intent.account_id,
                 "symbol": intent.symbol,
                 "side": intent.side,
                 "qty": intent.qty,
                 "entry_time": intent.entry_time,
-                "time_in_position_minutes": time_in_position / 60,
+                "time_in_position_minutes": time_in_position_minutes,
                 "target_ticks": intent.target_ticks,
                 "stop_ticks": intent.stop_ticks,
                 "confidence_score": intent.confidence_score,
                 "atr_value": intent.atr_value,
                 "breakeven_price": intent.breakeven_price,
-                "trail_price": intent.trail_price
+                "trail_price": intent.trail_price,
             }
-            
-        return summary
+            for coid, intent, time_in_position_minutes in zip(
+                self._pos_ids, map(active.__getitem__, self._pos_ids), minutes_in_position
+            )
+        }
 
@@ -1,13 +1,58 @@
+import asyncio
+import itertools
+import logging
 import os
 import uuid
+from array import array
 from dataclasses import dataclass
 from typing import Optional
 from typing import Dict, List
-from collections import deque
 import time
 from async_rithmic.enums import TransactionType, OrderType, OrderDuration
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Client order ids are a per-process random prefix plus a shared counter; only the
+# prefix costs a uuid4, so ids stay unique across restarts and engine instances
+_COID_PREFIX = uuid.uuid4().hex[:6]
+_COID_SEQ = itertools.count(1)
+
+# Field names probed, in priority order, on live order/position objects from the plants
+_ACCOUNT_FIELDS = ("account_id", "account")
+_ORDER_ID_FIELDS = ("user_tag", "client_order_id", "order_id")
+_POSITION_QTY_FIELDS = ("net_position", "position", "open_position", "position_qty", "quantity")
+_PRESENT_FIELDS: Dict[tuple, tuple] = {}
+# Position query methods exposed by the different plant implementations
+_POSITION_METHODS = ("list_positions", "get_positions", "positions", "list_open_positions", "get_open_positions")
+# Order enum values resolved once; the protobuf enum wrappers look members up via __getattr__
+_TX_BUY, _TX_SELL = TransactionType.BUY, TransactionType.SELL
+_OT_MARKET = OrderType.MARKET
+_OD_DAY = OrderDuration.DAY
+# TransactionType members are plain protobuf ints, so str() of them never names the side
+_TX_SIDES = {_TX_BUY: "BUY", _TX_SELL: "SELL"}
+
+
+def _present_fields(obj, names: tuple) -> tuple:
+    """Subset of `names` defined on obj, resolved once per type for fixed-layout (message) types"""
+    if hasattr(obj, "__dict__"):
+        # Plain objects may carry different attributes per instance; probe every time
+        return tuple(n for n in names if hasattr(obj, n))
+    key = (type(obj), names)
+    found = _PRESENT_FIELDS.get(key)
+    if found is None:
+        found = _PRESENT_FIELDS[key] = tuple(n for n in names if hasattr(obj, n))
+    return found
+
+
+def _first_truthy(obj, names: tuple):
+    for name in _present_fields(obj, names):
+        val = getattr(obj, name)
+        if val:
+            return val
+    return None
+
+
+@dataclass(slots=True)
 class OrderIntent:
     account_id: str
     symbol: str
@@ -17,6 +62,45 @@ class OrderIntent:
     target_ticks: int
     stop_ticks: int
 
+class _OrderTimes:
+    """Ring of an account's recent order timestamps (time.monotonic) for the per-minute limit"""
+
+    __slots__ = ("times", "mask", "head", "count")
+
+    def __init__(self, limit: int) -> None:
+        cap = 1
+        while cap < limit:
+            cap <<= 1
+        self.times = array("d", bytes(8 * cap))
+        self.mask = cap - 1
+        self.head = 0
+        self.count = 0
+
+    def _grow(self, limit: int) -> None:
+        # Limit raised at runtime: re-lay the recent stamps oldest-first in a larger ring
+        cap = self.mask + 1
+        recent = [self.times[(self.head - k) & self.mask] for k in range(min(self.count, cap), 0, -1)]
+        self.__init__(limit)
+        for t in recent:
+            self.record(t)
+
+    def allows(self, now: float, limit: int) -> bool:
+        """False when `limit` orders were already recorded within the last 60s"""
+        if limit <= 0:
+            return False
+        if limit > self.mask + 1:
+            self._grow(limit)
+        if self.count < limit:
+            return True
+        return now - self.times[(self.head - limit) & self.mask] > 60.0
+
+    def record(self, now: float) -> None:
+        self.times[self.head] = now
+        self.head = (self.head + 1) & self.mask
+        if self.count <= self.mask:
+            self.count += 1
+
+
 class ExecutionEngine:
     def __init__(self) -> None:
         self.account_enabled: Dict[str, bool] = {}
@@ -26,15 +110,27 @@ class ExecutionEngine:
         self.trading_enabled: bool = bool(int(os.getenv("TRADING_ENABLED", "0")))
         # Risk state
         self.max_daily_drawdown: float = float(os.getenv("MAX_DAILY_DRAWDOWN", "250.0"))
-        self.max_position: int = int(os.getenv("MAX_POSITION", "4"))
+        self.max_position = int(os.getenv("MAX_POSITION", "4"))
         self.max_orders_per_minute: int = int(os.getenv("MAX_ORDERS_PER_MINUTE", "60"))
         self.account_realized_pnl: Dict[str, float] = {}
         self.account_unrealized_pnl: Dict[str, float] = {}
         self.account_position_qty: Dict[str, int] = {}
         self.account_disabled: Dict[str, bool] = {}
-        self.account_order_times: Dict[str, deque] = {}
-        # Populated externally
-        self.whitelist = set((os.getenv("WHITELIST_ACCOUNTS", "").split(",")))
+        self.account_order_times: Dict[str, _OrderTimes] = {}
+        # Parsed once from the environment; may be replaced externally
+        self.whitelist = {a.strip() for a in os.getenv("WHITELIST_ACCOUNTS", "").split(",") if a.strip()}
+        # Plant type -> position method name that last answered, so reconciles skip the probe
+        self._positions_method: Dict[type, str] = {}
+
+    @property
+    def max_position(self) -> int:
+        return self._max_position
+
+    @max_position.setter
+    def max_position(self, value: int) -> None:
+        self._max_position = value
+        # The risk check compares against the magnitude; keep it next to the limit
+        self._max_position_abs = abs(value)
 
     def attach_order_plant(self, order_plant, default_exchange: str) -> None:
         self.order_plant = order_plant
@@ -42,27 +138,46 @@ class ExecutionEngine:
 
     def set_accounts(self, accounts: List[str]) -> None:
         # Enforce whitelist if provided
-        wl = set(a.strip() for a in os.getenv("WHITELIST_ACCOUNTS", "").split(",") if a.strip())
-        for acc in accounts:
-            if wl and acc not in wl:
-                continue
-            self.account_enabled[acc] = True
-            self.open_orders.setdefault(acc, {})
-            self.account_realized_pnl.setdefault(acc, 0.0)
-            self.account_unrealized_pnl.setdefault(acc, 0.0)
-            self.account_position_qty.setdefault(acc, 0)
-            self.account_disabled.setdefault(acc, False)
-            self.account_order_times.setdefault(acc, deque())
+        wl = self.whitelist
+        allowed = [acc for acc in accounts if acc in wl] if wl else list(accounts)
+        self.account_enabled.update(dict.fromkeys(allowed, True))
+        # Only accounts seen for the first time need their per-account state seeded;
+        # P&L/position may already have arrived from the plants, so keep those values
+        new = [acc for acc in allowed if acc not in self.open_orders]
+        if not new:
+            return
+        self.open_orders.update({acc: {} for acc in new})
+        for store, default in (
+            (self.account_realized_pnl, 0.0),
+            (self.account_unrealized_pnl, 0.0),
+            (self.account_position_qty, 0),
+            (self.account_disabled, False),
+        ):
+            for acc in new:
+                store.setdefault(acc, default)
+        limit = self.max_orders_per_minute
+        for acc in new:
+            if acc not in self.account_order_times:
+                self.account_order_times[acc] = _OrderTimes(limit)
 
     def _new_client_order_id(self, account_id: str) -> str:
-        return f"{account_id}-{uuid.uuid4().hex[:12]}"
+        return f"{account_id}-{_COID_PREFIX}{next(_COID_SEQ):06x}"
 
     async def submit_signal(self, symbol: str, side: str, qty: int, target_ticks: int, stop_ticks: int, accounts: List[str], exchange: Optional[str] = None) -> List[OrderIntent]:
         intents: List[OrderIntent] = []
+        submits = []
+        plant = self.order_plant
+        live = self.trading_enabled and plant is not None
+        if live:
+            tx = _TX_BUY if side.upper()=="BUY" else _TX_SELL
+            ot = _OT_MARKET
+            ex = exchange or self.default_exchange or "CME"
+        account_enabled, account_disabled = self.account_enabled, self.account_disabled
+        open_orders, wl = self.open_orders, self.whitelist
         for acc in accounts:
-            if not self.account_enabled.get(acc, False):
+            if not account_enabled.get(acc, False):
                 continue
-            if self.account_disabled.get(acc, False):
+            if account_disabled.get(acc, False):
                 continue
             allow, _ = self._should_allow_order(acc, side, qty)
             if not allow:
@@ -71,20 +186,17 @@ class ExecutionEngine:
             intent = OrderIntent(
                 account_id=acc, symbol=symbol, side=side, qty=qty, client_order_id=coid, target_ticks=target_ticks, stop_ticks=stop_ticks
             )
-            self.open_orders[acc][coid] = intent
+            open_orders[acc][coid] = intent
             intents.append(intent)
             self._record_order_time(acc)
             # Optionally submit live order if enabled and plant is attached
-            if self.trading_enabled and self.order_plant is not None and acc in self.whitelist:
-                try:
-                    tx = TransactionType.BUY if side.upper()=="BUY" else TransactionType.SELL
-                    ot = OrderType.MARKET
-                    ex = exchange or self.default_exchange or "CME"
-                    await self.order_plant.submit_order(
-                        order_id=coid, symbol=symbol, exchange=ex, qty=qty, transaction_type=tx, order_type=ot, account_id=acc, target_ticks=target_ticks, stop_ticks=stop_ticks, duration=OrderDuration.DAY
-                    )
-                except Exception:
-                    pass
+            if live and acc in wl:
+                submits.append(plant.submit_order(
+                    order_id=coid, symbol=symbol, exchange=ex, qty=qty, transaction_type=tx, order_type=ot, account_id=acc, target_ticks=target_ticks, stop_ticks=stop_ticks, duration=_OD_DAY
+                ))
+        if submits:
+            # Send all accounts' orders concurrently; a failed submit must not affect the others
+            await asyncio.gather(*submits, return_exceptions=True)
         return intents
 
     async def on_fill(self, account_id: str, client_order_id: str, fill_qty: int, fill_price: float) -> None:
@@ -93,82 +205,93 @@ class ExecutionEngine:
     async def reconcile_account(self, account_id: str) -> None:
         pass
 
+    async def _fetch_positions(self, plant):
+        cached = self._positions_method.get(type(plant))
+        if cached is not None:
+            try:
+                return await getattr(plant, cached)()
+            except Exception:
+                pass  # fall back to probing every candidate again
+        # Try a few method names commonly used
+        for name in _POSITION_METHODS:
+            if name == cached:
+                continue
+            try:
+                method = getattr(plant, name)
+            except Exception:
+                method = None
+            if callable(method):
+                try:
+                    result = await method()
+                except Exception:
+                    continue
+                self._positions_method[type(plant)] = name
+                return result
+        return []
+
     async def reconcile_accounts(self, order_plant, pnl_plant) -> None:
         """Query live orders and positions and update internal state per account.
         This keeps the dashboard/account state in sync after reconnects.
         """
+        # The two snapshots are independent, so query the plants concurrently
+        results = await asyncio.gather(
+            self._sync_orders(order_plant), self._sync_positions(order_plant, pnl_plant), return_exceptions=True
+        )
+        for phase, result in zip(("orders", "positions"), results):
+            if isinstance(result, Exception):
+                logger.warning("reconcile %s failed: %r", phase, result)
+
+    async def _sync_orders(self, order_plant) -> None:
         try:
-            # Sync orders
-            try:
-                live_orders = await order_plant.list_orders()
-            except Exception:
-                live_orders = []
-            acct_to_orders: Dict[str, Dict[str, OrderIntent]] = {}
-            for o in live_orders or []:
-                aid = getattr(o, "account_id", None) or getattr(o, "account", None)
-                coid = getattr(o, "user_tag", None) or getattr(o, "client_order_id", None) or getattr(o, "order_id", None)
-                sym = getattr(o, "symbol", None)
-                qty = int(getattr(o, "quantity", 0) or 0)
-                side_val = getattr(o, "transaction_type", None)
-                side = "BUY" if str(side_val).endswith("BUY") else ("SELL" if str(side_val).endswith("SELL") else "")
-                if aid and coid and sym:
-                    intent = OrderIntent(account_id=aid, symbol=sym, side=side or "", qty=qty, client_order_id=str(coid), target_ticks=0, stop_ticks=0)
-                    acct_to_orders.setdefault(aid, {})[str(coid)] = intent
-            # Overwrite snapshot for known accounts
-            for acc in self.account_enabled.keys():
-                self.open_orders[acc] = acct_to_orders.get(acc, {})
+            live_orders = await order_plant.list_orders()
         except Exception:
-            pass
+            live_orders = []
+        # Snapshot is rebuilt for known accounts only; orders of other accounts are skipped
+        acct_to_orders: Dict[str, Dict[str, OrderIntent]] = {acc: {} for acc in self.account_enabled}
+        for o in live_orders or []:
+            aid = _first_truthy(o, _ACCOUNT_FIELDS)
+            orders = acct_to_orders.get(aid)
+            if orders is None:
+                continue
+            coid = _first_truthy(o, _ORDER_ID_FIELDS)
+            sym = getattr(o, "symbol", None)
+            if not (coid and sym):
+                continue
+            qty = int(getattr(o, "quantity", 0) or 0)
+            side_val = getattr(o, "transaction_type", None)
+            side = _TX_SIDES.get(side_val)
+            if side is None:
+                # Name-style values from other sources, e.g. "BUY" or "TransactionType.SELL"
+                side_str = str(side_val)
+                side = "BUY" if side_str.endswith("BUY") else ("SELL" if side_str.endswith("SELL") else "")
+            orders[str(coid)] = OrderIntent(account_id=aid, symbol=sym, side=side, qty=qty, client_order_id=str(coid), target_ticks=0, stop_ticks=0)
+        # Overwrite snapshot for known accounts
+        self.open_orders.update(acct_to_orders)
 
-        # Try to reconcile positions from available plants
-        try:
-            async def _fetch_positions(plant):
-                # Try a few method names commonly used
-                for name in ("list_positions", "get_positions", "positions", "list_open_positions", "get_open_positions"):
-                    try:
-                        method = getattr(plant, name)
-                    except Exception:
-                        method = None
-                    if callable(method):
+    async def _sync_positions(self, order_plant, pnl_plant) -> None:
+        # Try to reconcile positions from available plants; _fetch_positions never raises
+        pos_list = await self._fetch_positions(pnl_plant)
+        if not pos_list:
+            pos_list = await self._fetch_positions(order_plant)
+
+        acct_to_pos: Dict[str, int] = {}
+        for p in pos_list or []:
+            try:
+                aid = _first_truthy(p, _ACCOUNT_FIELDS)
+                qty = None
+                for fname in _present_fields(p, _POSITION_QTY_FIELDS):
+                    val = getattr(p, fname)
+                    if val is not None:
                         try:
-                            return await method()
+                            qty = int(val)
+                            break
                         except Exception:
                             continue
-                return []
-
-            pos_list = []
-            try:
-                pos_list = await _fetch_positions(pnl_plant)
+                if aid and qty is not None:
+                    acct_to_pos[aid] = qty
             except Exception:
-                pos_list = []
-            if not pos_list:
-                try:
-                    pos_list = await _fetch_positions(order_plant)
-                except Exception:
-                    pos_list = []
-
-            acct_to_pos: Dict[str, int] = {}
-            for p in pos_list or []:
-                try:
-                    aid = getattr(p, "account_id", None) or getattr(p, "account", None)
-                    qty = None
-                    for fname in ("net_position", "position", "open_position", "position_qty", "quantity"):
-                        val = getattr(p, fname, None)
-                        if val is not None:
-                            try:
-                                qty = int(val)
-                                break
-                            except Exception:
-                                continue
-                    if aid and qty is not None:
-                        acct_to_pos[aid] = qty
-                except Exception:
-                    continue
-
-            for acc, qty in acct_to_pos.items():
-                self.account_position_qty[acc] = int(qty)
-        except Exception:
-            pass
+                continue
+        self.account_position_qty.update(acct_to_pos)
 
     def update_account_pnl(self, account_id: str, realized: Optional[float], unrealized: Optional[float]) -> None:
         if realized is not None:
@@ -184,30 +307,23 @@ class ExecutionEngine:
 
     def _should_allow_order(self, account_id: str, side: str, qty: int) -> (bool, str):
         if self.account_disabled.get(account_id, False):
-            try:
-                print(f"VETO: {account_id} disabled_by_drawdown", flush=True)
-            except Exception:
-                pass
+            logger.info("VETO: %s disabled_by_drawdown", account_id)
             return False, "disabled_by_drawdown"
         pos = self.account_position_qty.get(account_id, 0)
-        signed = qty if side.upper() == "BUY" else -qty
-        if abs(pos + signed) > abs(self.max_position):
-            try:
-                print(f"VETO: {account_id} max_position_exceeded pos={pos} qty={qty} side={side} max={self.max_position}", flush=True)
-            except Exception:
-                pass
+        signed = qty if (side == "BUY" or side.upper() == "BUY") else -qty
+        if abs(pos + signed) > self._max_position_abs:
+            logger.info("VETO: %s max_position_exceeded pos=%s qty=%s side=%s max=%s", account_id, pos, qty, side, self.max_position)
             return False, "max_position_exceeded"
-        dq = self.account_order_times.setdefault(account_id, deque())
-        now = time.time()
-        while dq and now - dq[0] > 60.0:
-            dq.popleft()
-        if len(dq) >= self.max_orders_per_minute:
-            try:
-                print(f"VETO: {account_id} rate_limited per_minute={self.max_orders_per_minute}", flush=True)
-            except Exception:
-                pass
+        times = self.account_order_times.get(account_id)
+        if times is None:
+            times = self.account_order_times[account_id] = _OrderTimes(self.max_orders_per_minute)
+        if not times.allows(time.monotonic(), self.max_orders_per_minute):
+            logger.info("VETO: %s rate_limited per_minute=%s", account_id, self.max_orders_per_minute)
             return False, "rate_limited"
         return True, "ok"
 
     def _record_order_time(self, account_id: str) -> None:
-        self.account_order_times.setdefault(account_id, deque()).append(time.time())
+        times = self.account_order_times.get(account_id)
+        if times is None:
+            times = self.account_order_times[account_id] = _OrderTimes(self.max_orders_per_minute)
+        times.record(time.monotonic())
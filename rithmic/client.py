@@ -1,6 +1,7 @@
 import asyncio
 import os
 from typing import List
+from dataclasses import replace
 from datetime import datetime, timezone
 
 import uvloop
@@ -21,6 +22,7 @@ from core.smm.combined import SMMCombinedSignal
 from core.smm.main import SMMMainEngine
 from core.smm.enhanced import EnhancedSMMEngine, create_enhanced_config
 from core.bars import BarAggregator, TBarsAggregator
+from core.logqueue import setup_logging
 
 async def run_trader(seconds: int) -> None:
     print(f"BOOT: run_trader seconds={seconds}", flush=True)
@@ -102,9 +104,8 @@ async def run_trader(seconds: int) -> None:
     bars_ticks = BarAggregator(mode="ticks", ticks_per_bar=int(os.getenv("TBAR_TICKS", "233")))
     bars_t12 = TBarsAggregator(base_size=int(os.getenv("TBAR_BASE_SIZE", "12")), tick_size=float(os.getenv("TICK_SIZE", "0.25")))
 
-    tick_count = 0
-    depth_count = 0
-    pnl_count = 0
+    # Event counters live in one dict so callbacks bump them without nonlocal cell rebinding
+    counts = {"tick": 0, "depth": 0, "pnl": 0, "errors": 0}
     last_price: float = 0.0
     last_tick_ts: float = 0.0
     last_depth_ts: float = 0.0
@@ -114,7 +115,6 @@ async def run_trader(seconds: int) -> None:
     last_best_ask: float = 0.0
     tick_size: float = float(os.getenv("TICK_SIZE", "0.25"))
     start_ts: float = time.time()
-    error_count: int = 0
     plant_status = {"ticker": False, "order": False, "pnl": False}
     diag_tick_dumped = 0
     diag_depth_dumped = 0
@@ -155,13 +155,13 @@ async def run_trader(seconds: int) -> None:
         payload = {
             "ts": time.time(),
             "symbols": symbols,
-            "counts": {"tick": tick_count, "depth": depth_count, "pnl": pnl_count},
+            "counts": {"tick": counts["tick"], "depth": counts["depth"], "pnl": counts["pnl"]},
             "last_price": last_price,
             "last_tick_ts": last_tick_ts,
             "last_depth_ts": last_depth_ts,
             "last_pnl_ts": last_pnl_ts,
             "start_ts": start_ts,
-            "errors": error_count,
+            "errors": counts["errors"],
             "plants": plant_status,
             "pnl_sum": pnl_sum,
         }
@@ -456,8 +456,8 @@ async def run_trader(seconds: int) -> None:
             print(f"Error in on_market_depth: {e}", flush=True)
 
     async def on_tick(data):
-        nonlocal tick_count, last_price, last_tick_ts, diag_tick_dumped, diag_tick_written, current_bar_buy_volume, current_bar_sell_volume, last_best_bid, last_best_ask
-        tick_count += 1
+        nonlocal last_price, last_tick_ts, diag_tick_dumped, diag_tick_written, current_bar_buy_volume, current_bar_sell_volume, last_best_bid, last_best_ask
+        counts["tick"] += 1
         try:
             plant_status["ticker"] = True
             # One-time: write full attribute list to file for mapping
@@ -646,8 +646,11 @@ async def run_trader(seconds: int) -> None:
                             
                             # Use enhanced signal if available, otherwise fall back to original
                             if enhanced_result.signal_side:
-                                gated.side = enhanced_result.signal_side
-                                gated.reason = f"enhanced_{enhanced_result.signal_side.lower()}"
+                                gated = replace(
+                                    gated,
+                                    side=enhanced_result.signal_side,
+                                    reason=f"enhanced_{enhanced_result.signal_side.lower()}",
+                                )
                                 print(f"Enhanced signal: {enhanced_result.signal_side}", flush=True)
                         else:
                             print(f"Enhanced SMM not ready: bars={len(enhanced_smm.bars)}", flush=True)
@@ -681,7 +684,7 @@ async def run_trader(seconds: int) -> None:
                 else:
                     try:
                         # Diagnostic: features not ready yet
-                        print(f"BAR_FEATURES: count={len(bar_features.bars)} ready={bar_features.is_ready()} (no signal)", flush=True)
+                        print(f"BAR_FEATURES: count={bar_features.bar_count} ready={bar_features.is_ready()} (no signal)", flush=True)
                     except Exception:
                         pass
                 # Respect dashboard control file toggle
@@ -777,12 +780,12 @@ async def run_trader(seconds: int) -> None:
                             except Exception:
                                 pass
         except Exception:
-            error_count += 1
+            counts["errors"] += 1
         write_metrics()
 
     async def on_order_book(data):
-        nonlocal depth_count, last_price, last_depth_ts, diag_depth_dumped, diag_depth_written, last_best_bid, last_best_ask
-        depth_count += 1
+        nonlocal last_price, last_depth_ts, diag_depth_dumped, diag_depth_written, last_best_bid, last_best_ask
+        counts["depth"] += 1
         try:
             plant_status["ticker"] = True
             if not diag_depth_written:
@@ -847,12 +850,11 @@ async def run_trader(seconds: int) -> None:
                     pass
                 diag_depth_dumped += 1
         except Exception:
-            error_count += 1
+            counts["errors"] += 1
         write_metrics()
 
     async def on_account_pnl_update(update):
-        nonlocal pnl_count
-        pnl_count += 1
+        counts["pnl"] += 1
         # Update per-account state for dashboard
         try:
             plant_status["pnl"] = True
@@ -927,7 +929,7 @@ async def run_trader(seconds: int) -> None:
                 except Exception:
                     pass
         except Exception:
-            error_count += 1
+            counts["errors"] += 1
         write_metrics()
 
     async def on_instrument_pnl_update(update):
@@ -1169,7 +1171,7 @@ async def run_trader(seconds: int) -> None:
     try:
         if seconds and seconds > 0:
             await asyncio.sleep(seconds)
-            print(f"COUNTS tick={tick_count} depth={depth_count} pnl={pnl_count}", flush=True)
+            print(f"COUNTS tick={counts['tick']} depth={counts['depth']} pnl={counts['pnl']}", flush=True)
         else:
             # Infinite run; park the task
             while True:
@@ -1203,7 +1205,6 @@ async def run_trader(seconds: int) -> None:
         print("DISCONNECTED", flush=True)
 
 async def main() -> None:
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     # Use project .env explicitly to avoid dotenv find errors
     try:
         env_path = str((Path(__file__).resolve().parents[1] / ".env"))
@@ -1218,4 +1219,10 @@ async def main() -> None:
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = setup_logging()
+    try:
+        # uvloop.run creates the uvloop loop directly; setting the policy from inside
+        # main() came too late, since asyncio.run had already built a default loop
+        uvloop.run(main())
+    finally:
+        log_listener.stop()
@@ -15,6 +15,7 @@ sys.path.insert(0, str(project_root))
 
 from core.external_signal_processor import process_external_signals_loop, get_signal_processor
 from core.account_sync_manager import get_sync_manager
+from core.logqueue import setup_logging
 
 
 async def main():
@@ -53,7 +54,15 @@ async def main():
     except Exception as e:
         print(f"❌ Error in signal processor: {e}")
         sys.exit(1)
+    finally:
+        # Write out sync state and signal records still waiting on their delayed saves
+        await get_sync_manager().flush()
+        await get_signal_processor().flush_records()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = setup_logging()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
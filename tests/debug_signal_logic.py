@@ -59,7 +59,7 @@ class SignalDebugger:
         
         # Check if feature engine is ready
         print(f"Feature engine ready: {self.bar_features.is_ready()}")
-        print(f"Bars in feature engine: {len(self.bar_features.bars)}")
+        print(f"Bars in feature engine: {self.bar_features.bar_count}")
         
         if self.bar_features.is_ready():
             bar_snap = self.bar_features.snapshot()
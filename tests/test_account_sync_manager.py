@@ -0,0 +1,110 @@
+import asyncio
+
+from core.account_sync_manager import AccountSyncManager
+
+
+def test_enabled_accounts_track_mutations(tmp_path):
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    mgr.add_account("A1")
+    mgr.add_account("A2", enabled=False)
+    mgr.add_account("A3")
+    assert mgr.get_enabled_accounts() == ["A1", "A3"]
+
+    mgr.update_account_state("A2", enabled=True)
+    mgr.update_account_state("A1", enabled=False)
+    assert mgr.get_enabled_accounts() == ["A3", "A2"]
+
+    mgr.remove_account("A3")
+    assert mgr.get_enabled_accounts() == ["A2"]
+    assert mgr.get_sync_statistics()["enabled_accounts"] == 1
+
+
+def test_sync_state_round_trip(tmp_path):
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    mgr.add_account("A1")
+    mgr.add_account("A2")
+    mgr.create_sync_group("main", ["A1", "A2", "missing"])
+
+    reloaded = AccountSyncManager(state_dir=str(tmp_path))
+    assert reloaded.get_all_sync_groups() == {"main": ["A1", "A2"]}
+
+
+def test_sync_state_writes_coalesce_in_event_loop(tmp_path, monkeypatch):
+    import threading
+
+    import core.account_sync_manager as asm
+
+    writes = []
+    write = asm._atomic_write_bytes
+    monkeypatch.setattr(asm, "_atomic_write_bytes", lambda path, data: (writes.append(threading.get_ident()), write(path, data)))
+
+    async def run():
+        mgr = AccountSyncManager(state_dir=str(tmp_path))
+        for i in range(10):
+            mgr.add_account(f"A{i}")
+        mgr.create_sync_group("all", [f"A{i}" for i in range(10)])
+        assert not mgr.sync_state_path.exists()
+        await mgr.flush()
+        # One coalesced write, done off the event loop thread
+        assert len(writes) == 1 and writes[0] != threading.get_ident()
+        return mgr
+
+    asyncio.run(run())
+    reloaded = AccountSyncManager(state_dir=str(tmp_path))
+    assert reloaded.get_sync_group_accounts("all") == [f"A{i}" for i in range(10)]
+
+
+def test_sync_state_write_leaves_no_temp_file(tmp_path):
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    mgr.add_account("A1")
+    assert mgr.sync_state_path.exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_synchronize_accounts_issues_one_batch(tmp_path, monkeypatch):
+    calls = []
+
+    async def fake_batch(account_ids, signal):
+        calls.append(list(account_ids))
+        return {acc: acc != "A2" for acc in account_ids}
+
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    for acc in ("A1", "A2", "A3"):
+        mgr.add_account(acc)
+    monkeypatch.setattr(mgr, "_execute_signal_batch", fake_batch)
+
+    results = asyncio.run(mgr.synchronize_accounts(["A1", "A2", "A3"], {"symbol": "NQ", "side": "BUY"}))
+    assert calls == [["A1", "A2", "A3"]]
+    assert results == {"A1": True, "A2": False, "A3": True}
+    assert mgr.accounts["A2"].sync_status == "error"
+    assert mgr.accounts["A1"].sync_status == "synced"
+
+
+def test_remove_account_updates_only_its_groups(tmp_path):
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    for acc in ("A1", "A2", "A3"):
+        mgr.add_account(acc)
+    mgr.create_sync_group("g1", ["A1", "A2"])
+    mgr.create_sync_group("g2", ["A1"])
+    mgr.create_sync_group("g3", ["A3"])
+
+    mgr.remove_account("A1")
+    assert mgr.get_all_sync_groups() == {"g1": ["A2"], "g3": ["A3"]}
+
+    # Redefining a group drops stale memberships from the index
+    mgr.create_sync_group("g1", ["A3"])
+    mgr.remove_account("A2")
+    assert mgr.get_all_sync_groups() == {"g1": ["A3"], "g3": ["A3"]}
+
+
+def test_pending_sync_state_written_when_loop_shuts_down(tmp_path):
+    mgr = AccountSyncManager(state_dir=str(tmp_path))
+    mgr.add_account("A1")
+    mgr.save_delay_seconds = 60.0
+
+    async def run():
+        mgr.create_sync_group("main", ["A1"])
+        # Return without flush(); asyncio.run cancels the pending delayed save
+
+    asyncio.run(run())
+    assert AccountSyncManager(state_dir=str(tmp_path)).get_all_sync_groups() == {"main": ["A1"]}
@@ -0,0 +1,55 @@
+from core.bar_features import BarFeatureEngine, BarData
+
+
+def make_bar(i: int, buy: float, sell: float) -> BarData:
+    return BarData(timestamp=float(i), open=100.0 + i, high=101.0 + i, low=99.5 + i, close=100.5 + i,
+                   volume=buy + sell, buy_volume=buy, sell_volume=sell)
+
+
+def test_snapshot_uses_recent_bars_for_buy_ratio():
+    eng = BarFeatureEngine(window=20)
+    for i in range(15):
+        eng.add_bar(make_bar(i, 0.0, 10.0) if i < 5 else make_bar(i, 30.0, 10.0))
+    snap = eng.snapshot()
+    assert snap.bar_count == 15
+    assert abs(snap.aggressive_buy_ratio - 0.75) < 1e-12
+    assert abs(snap.avg_bar_size - 1.5) < 1e-12
+    assert snap.cvd_slope > 0.0
+    assert 0.5 < snap.delta_confidence <= 1.0
+
+
+def test_window_wrap_keeps_bar_order():
+    eng = BarFeatureEngine(window=4)
+    for i in range(7):
+        eng.add_bar(make_bar(i, 1.0, 1.0))
+    recent = eng.get_recent_bars(3)
+    assert [b.timestamp for b in recent] == [4.0, 5.0, 6.0]
+    assert eng.bar_count == 4 and eng.is_ready() is False
+
+
+def test_snapshot_cached_until_next_bar():
+    eng = BarFeatureEngine(window=5)
+    for i in range(3):
+        eng.add_bar(make_bar(i, 6.0, 4.0))
+    first = eng.snapshot()
+    assert eng.snapshot() is first
+    eng.add_bar(make_bar(3, 1.0, 9.0))
+    second = eng.snapshot()
+    assert second is not first
+    assert second.bar_count == 4
+
+
+def test_snapshot_after_wrap_matches_fresh_engine():
+    bars = [make_bar(i, float(i % 7), float((3 * i) % 5)) for i in range(33)]
+    wrapped = BarFeatureEngine(window=12)
+    for b in bars:
+        wrapped.add_bar(b)
+    fresh = BarFeatureEngine(window=12)
+    fresh._cvd = sum(b.buy_volume - b.sell_volume for b in bars[:-12])
+    for b in bars[-12:]:
+        fresh.add_bar(b)
+    a, b = wrapped.snapshot(), fresh.snapshot()
+    assert abs(a.aggressive_buy_ratio - b.aggressive_buy_ratio) < 1e-12
+    assert abs(a.avg_bar_size - b.avg_bar_size) < 1e-12
+    assert abs(a.price_momentum - b.price_momentum) < 1e-12
+    assert abs(a.delta_confidence - b.delta_confidence) < 1e-9
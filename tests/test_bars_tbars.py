@@ -1,4 +1,4 @@
-from core.bars import TBarsAggregator
+from core.bars import BarAggregator, TBarsAggregator
 
 
 def test_tbars_basic_breakout_sequence():
@@ -19,3 +19,24 @@ def test_tbars_basic_breakout_sequence():
     assert b.end_ts >= b.start_ts
 
 
+def test_tick_bar_ohlc():
+    agg = BarAggregator(mode="ticks", ticks_per_bar=4)
+    out = []
+    for i, p in enumerate([100.0, 101.0, 99.0, 100.5, 102.0]):
+        out.extend(agg.update(p, 2, ts=float(i)))
+    assert len(out) == 1
+    b = out[0]
+    assert (b.open, b.high, b.low, b.close) == (100.0, 101.0, 99.0, 100.5)
+    assert b.volume == 8.0 and b.start_ts == 0.0 and b.end_ts == 3.0
+
+
+def test_time_bar_closes_after_duration():
+    agg = BarAggregator(mode="time", duration_sec=60)
+    assert isinstance(agg, BarAggregator) and agg.mode == "time"
+    out = []
+    for ts, p in [(0.0, 100.0), (30.0, 100.5), (59.0, 99.5), (60.0, 100.25), (61.0, 100.0)]:
+        out.extend(agg.update(p, 1, ts=ts))
+    assert len(out) == 1
+    b = out[0]
+    assert (b.open, b.high, b.low, b.close) == (100.0, 100.5, 99.5, 100.25)
+    assert b.start_ts == 0.0 and b.end_ts == 60.0
@@ -0,0 +1,44 @@
+import numpy as np
+from core.buffers import Ema, RingBuffer, RollingSlope
+
+
+def test_ring_buffer_append_with_evicted():
+    rb = RingBuffer(3)
+    assert [rb.append_with_evicted(v) for v in (1.0, 2.0, 3.0)] == [None, None, None]
+    assert rb.append_with_evicted(4.0) == 1.0
+    assert list(rb.values()) == [2.0, 3.0, 4.0]
+
+
+def test_rolling_slope_matches_least_squares():
+    rs = RollingSlope(20)
+    rng = np.random.default_rng(7)
+    ys = np.cumsum(rng.normal(0, 50, size=137))
+    for i, y in enumerate(ys):
+        rs.append(float(y))
+        window = ys[max(0, i - 19):i + 1]
+        expected = np.polyfit(np.arange(len(window)), window, 1)[0] if len(window) >= 2 else 0.0
+        assert abs(rs.slope() - expected) < 1e-6
+
+
+def test_ring_buffer_fast_reductions_match_values():
+    rb = RingBuffer(5)
+    for v in range(1, 9):
+        rb.append(float(v))
+    vals = rb.values()
+    older, newer = rb.view_pair()
+    assert list(np.concatenate((older, newer))) == list(vals)
+    assert rb.sum_fast() == float(vals.sum())
+    assert rb.mean_fast() == float(vals.mean())
+    w = np.arange(5, dtype=np.float64)
+    assert rb.dot_fast(w) == float(np.dot(vals, w))
+    assert rb.last() == 8.0
+
+
+def test_ema_seeds_then_smooths():
+    ema = Ema(3)
+    assert ema.slope() == 0.0
+    assert ema.update(10.0) == 10.0
+    assert ema.slope() == 0.0
+    assert ema.update(12.0) == 11.0
+    assert ema.update(11.0) == 11.0
+    assert ema.slope() == 0.0
@@ -0,0 +1,203 @@
+import time
+
+import numpy as np
+
+from exec.enhanced_executor import EXIT_REASONS, EnhancedExecutionEngine, EnhancedOrderIntent
+
+
+def make_engine(n_positions: int) -> EnhancedExecutionEngine:
+    eng = EnhancedExecutionEngine()
+    eng.time_based_exit = True
+    eng.momentum_exit = True
+    eng.profit_target_early, eng.breakeven_activation, eng.momentum_threshold = 8, 6, 0.3
+    now = time.time()
+    for i in range(n_positions):
+        eng._track_position(EnhancedOrderIntent(
+            account_id=f"A{i}", symbol="NQ", side="BUY", qty=1, client_order_id=f"c{i}",
+            target_ticks=16, stop_ticks=8, entry_time=now - 60, entry_price=20000.0 + i,
+            max_hold_time=now - 1 if i % 5 == 0 else now + 600,
+            momentum_exit_threshold=0.1 if i % 3 == 0 else 0.9,
+        ))
+    return eng
+
+
+def test_exit_batch_matches_scalar_checks():
+    n = 2000  # past the initial column capacity
+    pnls = np.resize([0.0, 1.0, 1.6, 2.5, 0.5, 3.0, 1.5], n)
+    scalar, batch = make_engine(n), make_engine(n)
+    expected = [scalar.check_exit_conditions(f"c{i}", 0.0, pnls[i]) for i in range(n)]
+    codes = batch.check_exit_conditions_batch(pnls)
+    assert [EXIT_REASONS[c] for c in codes] == expected
+    # Breakeven activation is applied once, in both paths
+    again = batch.check_exit_conditions_batch(pnls)
+    assert [EXIT_REASONS[c] for c in again] == [scalar.check_exit_conditions(f"c{i}", 0.0, pnls[i]) for i in range(n)]
+    # Breakeven is the entry price, not the entry timestamp
+    activated = [i for i, c in enumerate(codes) if EXIT_REASONS[c] == "breakeven_activated"]
+    assert activated
+    for i in activated:
+        assert batch.active_positions[f"c{i}"].breakeven_price == 20000.0 + i
+        assert scalar.active_positions[f"c{i}"].breakeven_price == 20000.0 + i
+
+
+def test_positions_summary_uses_entry_columns():
+    eng = make_engine(3)
+    eng.update_position_momentum("c1", 0.05)
+    summary = eng.get_active_positions_summary()
+    assert list(summary) == ["c0", "c1", "c2"]
+    assert abs(summary["c2"]["time_in_position_minutes"] - 1.0) < 0.1
+    assert EXIT_REASONS[eng.check_exit_conditions_batch(np.zeros(3))[1]] == "momentum_exit"
+
+
+def test_trading_window_matches_local_clock():
+    from datetime import datetime, timedelta
+
+    eng = EnhancedExecutionEngine()
+    eng.trading_window_enabled = True
+    local = datetime.now(eng.timezone)
+    inside = (local - timedelta(minutes=5)).time(), (local + timedelta(minutes=5)).time()
+    outside = (local + timedelta(minutes=5)).time(), (local + timedelta(minutes=10)).time()
+    for (start, end), expected in ((inside, True), (outside, False)):
+        if start > end:  # window would straddle midnight; not supported by the check
+            continue
+        eng._win_start_sec, eng._win_end_sec = eng._seconds_of_day(start), eng._seconds_of_day(end)
+        assert eng._is_trading_window_active() is expected
+
+
+def test_config_parse_is_cached_per_mtime(tmp_path, monkeypatch):
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text("strategy:\n  bracket:\n    target_ticks: 20\n")
+    monkeypatch.chdir(tmp_path)
+    EnhancedExecutionEngine._load_config_cached.cache_clear()
+    a, b = EnhancedExecutionEngine(), EnhancedExecutionEngine()
+    assert a.target_ticks == b.target_ticks == 20
+    assert EnhancedExecutionEngine._load_config_cached.cache_info().hits == 1
+    a.config["strategy"]["bracket"]["target_ticks"] = 99
+    assert EnhancedExecutionEngine().target_ticks == 20
+
+
+def test_sizing_diagnostics_logged_at_debug(caplog):
+    eng = make_engine(0)
+    eng.test_accounts = set()
+    with caplog.at_level("INFO", logger="exec.enhanced_executor"):
+        eng._calculate_position_size("A1", 0.9, 0.0, 20000.0)
+    assert caplog.records == []
+    with caplog.at_level("DEBUG", logger="exec.enhanced_executor"):
+        eng._calculate_position_size("A1", 0.9, 0.0, 20000.0)
+    assert [r.getMessage()[:21] for r in caplog.records] == ["QTY DEBUG: account=A1"]
+
+
+def test_submit_skips_are_logged(caplog):
+    import asyncio
+
+    eng = make_engine(0)
+    eng.set_accounts(["A1"])
+    eng.test_accounts = set()
+    eng.trading_window_enabled = False
+    with caplog.at_level("INFO", logger="exec.enhanced_executor"):
+        asyncio.run(eng.submit_enhanced_signal("NQ", "BUY", 0.9, 0.0, 20000.0, ["A1", "OFF"]))
+    messages = [r.getMessage() for r in caplog.records]
+    assert "SUBMIT SKIP: account OFF not enabled" in messages
+    assert any(m.startswith("LIVE SUBMIT SKIP: acc=A1") for m in messages)
+
+
+def test_submit_sizes_once_and_gates_test_accounts():
+    import asyncio
+
+    eng = make_engine(0)
+    eng.set_accounts(["A1", "A2", "A3"])
+    eng.test_accounts = {"A1", "A3"}
+    eng.trading_window_enabled = False
+    intents = asyncio.run(eng.submit_enhanced_signal("NQ", "BUY", 0.9, 0.0, 20000.0, ["A1", "A2", "A3"]))
+    expected_qty = eng._compute_common_qty(0.9, 0.0, 20000.0)
+    assert [(i.account_id, i.qty) for i in intents] == [("A1", expected_qty), ("A3", expected_qty)]
+    assert len(eng.active_positions) == 2
+
+
+def test_signal_for_disabled_accounts_does_no_sizing():
+    import asyncio
+
+    eng = make_engine(0)
+    eng.set_accounts(["A1"])
+    eng.account_enabled["A1"] = False
+    eng.trading_window_enabled = False
+    eng.volatility_adjustment = True
+    # A zero price with atr > 0 would divide by zero if the signal were sized
+    assert asyncio.run(eng.submit_enhanced_signal("NQ", "BUY", 0.9, 5.0, 0.0, ["A1", "UNKNOWN"])) == []
+
+
+def test_client_order_ids_unique_across_engines():
+    a, b = EnhancedExecutionEngine(), EnhancedExecutionEngine()
+    ids = [eng._new_client_order_id("ACC1") for eng in (a, b) for _ in range(1000)]
+    assert len(set(ids)) == len(ids)
+    assert all(i.startswith("ACC1-") for i in ids)
+
+
+def test_signal_batch_sends_all_live_orders_in_one_round():
+    import asyncio
+
+    class Plant:
+        def __init__(self):
+            self.in_flight = self.peak = 0
+
+        async def submit_order(self, **kwargs):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+
+    eng = make_engine(0)
+    eng.set_accounts(["A1", "A2"])
+    eng.test_accounts = set()
+    eng.whitelist = {"A1", "A2"}
+    eng.trading_window_enabled = False
+    eng.trading_enabled = True
+    eng.max_position = 100
+    plant = Plant()
+    eng.attach_order_plant(plant, "CME")
+    signal = dict(symbol="NQ", side="BUY", confidence_score=0.9, atr_value=0.0, current_price=20000.0, accounts=["A1", "A2"])
+    results = asyncio.run(eng.submit_enhanced_signal_batch([signal, dict(signal, side="SELL")]))
+    assert [[i.account_id for i in r] for r in results] == [["A1", "A2"], ["A1", "A2"]]
+    assert plant.peak == 4
+
+
+def test_bad_signal_in_batch_only_fails_itself():
+    import asyncio
+    import warnings
+
+    import pytest
+
+    class Plant:
+        def __init__(self):
+            self.sent = []
+
+        async def submit_order(self, order_id, **kwargs):
+            self.sent.append(order_id)
+
+    eng = make_engine(0)
+    eng.set_accounts(["A1", "A2"])
+    eng.test_accounts = set()
+    eng.whitelist = {"A1", "A2"}
+    eng.trading_window_enabled = False
+    eng.trading_enabled = True
+    eng.volatility_adjustment = True
+    eng.max_position = 100
+    plant = Plant()
+    eng.attach_order_plant(plant, "CME")
+    good = dict(symbol="NQ", side="BUY", confidence_score=0.9, atr_value=0.0, current_price=20000.0, accounts=["A1", "A2"])
+    # atr > 0 with a zero price divides by zero while sizing
+    bad = dict(good, atr_value=5.0, current_price=0.0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        results = asyncio.run(eng.submit_enhanced_signal_batch([good, bad, dict(good, side="SELL")], return_exceptions=True))
+        assert isinstance(results[1], ZeroDivisionError)
+        assert [len(results[0]), len(results[2])] == [2, 2]
+        sent = [i.client_order_id for r in (results[0], results[2]) for i in r]
+        assert sorted(plant.sent) == sorted(sent)
+        assert len(eng.active_positions) == 4
+
+        # Without return_exceptions the error is raised, but only after the good orders went out
+        plant.sent.clear()
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(eng.submit_enhanced_signal_batch([bad, good]))
+        assert len(plant.sent) == 2
@@ -0,0 +1,208 @@
+import asyncio
+
+from exec.executor import ExecutionEngine
+
+
+class SlowPlant:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.submitted = []
+
+    async def submit_order(self, order_id, account_id, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if account_id == "BAD":
+            raise RuntimeError("rejected")
+        self.submitted.append(order_id)
+
+
+def test_submit_signal_sends_accounts_concurrently():
+    eng = ExecutionEngine()
+    accounts = ["A1", "BAD", "A2", "A3"]
+    eng.set_accounts(accounts)
+    eng.whitelist = set(accounts)
+    eng.trading_enabled = True
+    plant = SlowPlant()
+    eng.attach_order_plant(plant, "CME")
+    intents = asyncio.run(eng.submit_signal("NQZ5", "BUY", 1, 16, 8, accounts))
+    assert [i.account_id for i in intents] == accounts
+    assert plant.peak == len(accounts)
+    # A rejected submit leaves the other accounts' orders in place
+    assert sorted(plant.submitted) == sorted(i.client_order_id for i in intents if i.account_id != "BAD")
+
+
+def test_order_rate_limit_window(monkeypatch):
+    import exec.executor as executor
+
+    clock = [1000.0]
+    monkeypatch.setattr(executor.time, "monotonic", lambda: clock[0])
+    eng = ExecutionEngine()
+    eng.max_orders_per_minute = 3
+    eng.set_accounts(["A1"])
+    for _ in range(3):
+        assert eng._should_allow_order("A1", "BUY", 0) == (True, "ok")
+        eng._record_order_time("A1")
+        clock[0] += 10.0
+    assert eng._should_allow_order("A1", "BUY", 0) == (False, "rate_limited")
+    # The oldest order leaves the window 60s after it was placed
+    clock[0] = 1060.5
+    assert eng._should_allow_order("A1", "BUY", 0) == (True, "ok")
+    # Raising the limit keeps the recorded history
+    eng.max_orders_per_minute = 5
+    eng._record_order_time("A1")
+    eng._record_order_time("A1")
+    clock[0] = 1061.0
+    assert eng._should_allow_order("A1", "BUY", 0) == (True, "ok")
+    eng._record_order_time("A1")
+    assert eng._should_allow_order("A1", "BUY", 0) == (False, "rate_limited")
+
+
+def test_whitelist_parsed_once_from_env(monkeypatch):
+    monkeypatch.setenv("WHITELIST_ACCOUNTS", "A1, A2,")
+    eng = ExecutionEngine()
+    assert eng.whitelist == {"A1", "A2"}
+    monkeypatch.setenv("WHITELIST_ACCOUNTS", "A3")
+    eng.set_accounts(["A1", "A2", "A3"])
+    assert sorted(eng.account_enabled) == ["A1", "A2"]
+
+
+def test_reconcile_accounts_probes_plant_fields():
+    from collections import namedtuple
+    from types import SimpleNamespace
+
+    from async_rithmic.enums import TransactionType
+
+    Order = namedtuple("Order", "account_id user_tag order_id symbol quantity transaction_type")
+    Position = namedtuple("Position", "account net_position")
+
+    class Plant:
+        async def list_orders(self):
+            return [
+                Order("A1", "A1-tag", "x1", "NQZ5", 1, "TransactionType.BUY"),
+                Order("A1", "", "x2", "NQZ5", 2, "TransactionType.SELL"),
+                SimpleNamespace(account="A2", order_id="x3", symbol="NQZ5", quantity=1, transaction_type=TransactionType.BUY),
+                SimpleNamespace(account="OTHER", order_id="x4", symbol="NQZ5", quantity="bad"),
+            ]
+
+        async def list_positions(self):
+            return [Position("A1", 2), SimpleNamespace(account_id="A2", position=None, quantity=-1)]
+
+    eng = ExecutionEngine()
+    eng.set_accounts(["A1", "A2"])
+    asyncio.run(eng.reconcile_accounts(Plant(), Plant()))
+    assert sorted(eng.open_orders["A1"]) == ["A1-tag", "x2"]
+    assert eng.open_orders["A1"]["x2"].side == "SELL"
+    assert list(eng.open_orders["A2"]) == ["x3"]
+    assert eng.open_orders["A2"]["x3"].side == "BUY"
+    assert "OTHER" not in eng.open_orders
+    assert eng.account_position_qty == {"A1": 2, "A2": -1}
+    assert eng._positions_method == {Plant: "list_positions"}
+
+
+def test_fetch_positions_caches_method_per_plant_type():
+    class Plant:
+        def __init__(self):
+            self.calls = []
+            self.fail_get = False
+
+        async def list_positions(self):
+            self.calls.append("list_positions")
+            raise RuntimeError("not supported")
+
+        async def get_positions(self):
+            self.calls.append("get_positions")
+            if self.fail_get:
+                raise RuntimeError("down")
+            return ["p"]
+
+        async def get_open_positions(self):
+            self.calls.append("get_open_positions")
+            return ["q"]
+
+    eng, plant = ExecutionEngine(), Plant()
+    assert asyncio.run(eng._fetch_positions(plant)) == ["p"]
+    plant.calls.clear()
+    assert asyncio.run(eng._fetch_positions(plant)) == ["p"]
+    assert plant.calls == ["get_positions"]
+    # A failing cached method falls back to the full probe
+    plant.fail_get = True
+    assert asyncio.run(eng._fetch_positions(plant)) == ["q"]
+
+
+def test_reconcile_queries_orders_and_positions_concurrently():
+    class Plant:
+        def __init__(self, log):
+            self.log = log
+
+        async def list_orders(self):
+            self.log.append("orders-start")
+            await asyncio.sleep(0.01)
+            self.log.append("orders-end")
+            return []
+
+        async def list_positions(self):
+            self.log.append("positions-start")
+            await asyncio.sleep(0.01)
+            self.log.append("positions-end")
+            return []
+
+    log = []
+    eng = ExecutionEngine()
+    asyncio.run(eng.reconcile_accounts(Plant(log), Plant(log)))
+    assert log[:2] == ["orders-start", "positions-start"]
+
+
+def test_order_intents_are_slotted():
+    from exec.enhanced_executor import EnhancedOrderIntent
+    from exec.executor import OrderIntent
+
+    base = OrderIntent("A1", "NQZ5", "BUY", 1, "c1", 16, 8)
+    enhanced = EnhancedOrderIntent("A1", "NQZ5", "BUY", 1, "c1", 16, 8, entry_time=0.0, max_hold_time=60.0)
+    assert not hasattr(base, "__dict__") and not hasattr(enhanced, "__dict__")
+
+
+def test_set_accounts_seeds_new_accounts_only():
+    eng = ExecutionEngine()
+    eng.whitelist = set()
+    eng.update_account_pnl("A2", -10.0, None)
+    eng.set_accounts(["A1", "A2"])
+    assert eng.account_realized_pnl == {"A2": -10.0, "A1": 0.0}
+    eng.open_orders["A1"]["c1"] = object()
+    eng.account_enabled["A1"] = False
+    eng.set_accounts(["A1", "A3"])
+    assert eng.account_enabled == {"A1": True, "A2": True, "A3": True}
+    assert list(eng.open_orders["A1"]) == ["c1"]
+    assert set(eng.account_order_times) == {"A1", "A2", "A3"}
+
+
+def test_max_position_limit_follows_reassignment():
+    eng = ExecutionEngine()
+    eng.set_accounts(["A1"])
+    eng.account_position_qty["A1"] = 2
+    eng.max_position = -3
+    assert eng._should_allow_order("A1", "buy", 1) == (True, "ok")
+    assert eng._should_allow_order("A1", "BUY", 2) == (False, "max_position_exceeded")
+    assert eng._should_allow_order("A1", "SELL", 5) == (True, "ok")
+
+
+def test_reconcile_phase_failure_is_logged_and_isolated(caplog):
+    from types import SimpleNamespace
+
+    class Plant:
+        async def list_orders(self):
+            return [SimpleNamespace(account_id="A1", order_id="x1", symbol="NQZ5", quantity="bad")]
+
+        async def list_positions(self):
+            return [SimpleNamespace(account_id="A1", net_position=3)]
+
+    eng = ExecutionEngine()
+    eng.set_accounts(["A1"])
+    eng.open_orders["A1"]["keep"] = None
+    with caplog.at_level("WARNING", logger="exec.executor"):
+        asyncio.run(eng.reconcile_accounts(Plant(), Plant()))
+    assert "reconcile orders failed" in caplog.text
+    assert list(eng.open_orders["A1"]) == ["keep"]
+    assert eng.account_position_qty["A1"] == 3
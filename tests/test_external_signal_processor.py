@@ -0,0 +1,221 @@
+import asyncio
+
+import core.account_sync_manager as account_sync_manager
+import core.external_signal_processor as esp
+from core.external_signal_processor import ExternalSignalData, ExternalSignalProcessor
+
+
+def make_processor(tmp_path, monkeypatch) -> ExternalSignalProcessor:
+    monkeypatch.setattr(account_sync_manager, "_sync_manager_instance",
+                        account_sync_manager.AccountSyncManager(state_dir=str(tmp_path)))
+    proc = ExternalSignalProcessor(state_dir=str(tmp_path))
+    proc.signal_cooldown_seconds = 0.0
+    return proc
+
+
+def make_signal(ts: float) -> ExternalSignalData:
+    return ExternalSignalData(timestamp=ts, symbol="NQ", side="BUY", signal_type="ENTRY", price=100.0,
+                              reason="", source="test", confidence_score=0.8, atr_value=0.25, exchange="CME")
+
+
+def test_rate_limit_rolls_over_after_a_minute(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    proc.max_signals_per_minute = 3
+    now = 1000.0
+    monkeypatch.setattr(esp.time, "time", lambda: now)
+    for i in range(3):
+        assert proc._should_process_signal(make_signal(i))
+        proc._mark_processed(proc._signal_key(make_signal(i)), now)
+    assert not proc._should_process_signal(make_signal(3))
+    # Duplicates are rejected regardless of the rate window
+    now = 1100.0
+    assert not proc._should_process_signal(make_signal(0))
+    assert proc._should_process_signal(make_signal(3))
+    assert proc.get_processing_stats()["signals_processed_last_5min"] == 3
+
+
+def test_dedup_keys_are_bounded(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    monkeypatch.setattr(esp, "MAX_DEDUP_KEYS", 4)
+    for i in range(6):
+        proc._mark_processed(proc._signal_key(make_signal(i)), float(i))
+    assert len(proc.processed_signals) == 4
+    assert proc._signal_key(make_signal(0)) not in proc.processed_signals
+    assert proc.get_processing_stats()["total_processed_signals"] == 6
+
+
+def test_load_new_signals_reads_only_appended_lines(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    line = '{{"timestamp": {ts}, "symbol": "NQ", "side": "BUY", "signal_type": "ENTRY"}}\n'
+    with proc.external_signals_path.open("w") as f:
+        f.write(line.format(ts=1.0) + line.format(ts=2.0))
+    assert [s.timestamp for s in proc.load_new_signals()] == [1.0, 2.0]
+
+    # A partially written line is picked up once it is complete
+    with proc.external_signals_path.open("a") as f:
+        f.write(line.format(ts=3.0) + '{"timestamp": 4.0')
+    assert [s.timestamp for s in proc.load_new_signals()] == [3.0]
+    with proc.external_signals_path.open("a") as f:
+        f.write(', "symbol": "NQ"}\n')
+    assert [s.timestamp for s in proc.load_new_signals()] == [4.0]
+    assert proc.load_new_signals() == []
+
+
+def test_processed_records_are_batched_in_event_loop(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+
+    async def run():
+        for i in range(5):
+            proc._record_processed_signal(make_signal(float(i)))
+        assert not proc.processed_signals_path.exists()
+        await proc.flush_records()
+
+    asyncio.run(run())
+    assert len(proc.processed_signals_path.read_text().splitlines()) == 5
+
+
+def test_processed_records_written_when_loop_shuts_down(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    proc.record_flush_delay_seconds = 60.0
+
+    async def run():
+        for i in range(3):
+            proc._record_processed_signal(make_signal(float(i)))
+        await asyncio.sleep(0)  # let the flush task start sleeping
+
+    # asyncio.run cancels the pending flush task on exit
+    asyncio.run(run())
+    assert len(proc.processed_signals_path.read_text().splitlines()) == 3
+
+
+def test_current_price_file_is_reparsed_only_when_changed(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    metrics = tmp_path / "metrics.json"
+    assert proc._get_current_price("NQ") is None
+    metrics.write_text('{"last_price": 100.25}')
+    assert proc._get_current_price("NQ") == 100.25
+
+    calls = []
+    monkeypatch.setattr(esp, "json_loads", lambda data: calls.append(data) or {"last_price": -1})
+    assert proc._get_current_price("NQ") == 100.25
+    assert calls == []
+
+    metrics.write_text('{"last_price": 101.5, "x": 1}')
+    assert proc._get_current_price("NQ") is None  # reparsed through the patched loader
+    assert len(calls) == 1
+
+
+def test_process_new_signals_runs_concurrently(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    in_flight = []
+    peak = []
+
+    async def fake_entry(signal):
+        in_flight.append(signal)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(signal)
+
+    monkeypatch.setattr(proc, "_process_entry_signal", fake_entry)
+    monkeypatch.setattr(proc, "load_new_signals", lambda: [make_signal(float(i)) for i in range(4)])
+    assert asyncio.run(proc.process_new_signals()) == 4
+    assert max(peak) == 4
+
+
+def test_entry_submissions_share_one_executor_batch(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    calls = []
+
+    async def fake_batch(signals, return_exceptions=False):
+        calls.append([s["symbol"] for s in signals])
+        return [[s["symbol"]] for s in signals]
+
+    monkeypatch.setattr(proc.executor, "submit_enhanced_signal_batch", fake_batch)
+
+    async def run():
+        return await asyncio.gather(*(proc._submit_entry(symbol=f"S{i}") for i in range(3)))
+
+    assert asyncio.run(run()) == [["S0"], ["S1"], ["S2"]]
+    assert calls == [["S0", "S1", "S2"]]
+
+
+def test_signal_side_and_type_are_normalized():
+    sig = ExternalSignalData(timestamp=1.0, symbol="NQ", side="sell", signal_type="Entry", price=1.0,
+                             reason="", source="", confidence_score=0.5, atr_value=0.0, exchange="CME")
+    assert (sig.side, sig.signal_type) == ("SELL", "ENTRY")
+
+
+def test_remarked_key_moves_to_newest(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    monkeypatch.setattr(esp, "MAX_DEDUP_KEYS", 2)
+    proc._mark_processed("a", 1.0)
+    proc._mark_processed("b", 2.0)
+    proc._mark_processed("a", 3.0)
+    proc._mark_processed("c", 4.0)
+    assert list(proc.processed_signals) == ["a", "c"]
+
+
+def test_signal_file_changes_wakes_only_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(esp, "Inotify", None)
+    monkeypatch.setattr(esp, "SIGNAL_FILE_POLL_SECONDS", 0.001)
+    path = tmp_path / "external_signals.json"
+
+    async def run():
+        changes = esp._signal_file_changes(path)
+        await asyncio.wait_for(changes.__anext__(), 1.0)  # initial pass
+        nxt = asyncio.ensure_future(changes.__anext__())
+        await asyncio.sleep(0.02)
+        assert not nxt.done()
+        path.write_text("{}\n")
+        await asyncio.wait_for(nxt, 1.0)
+        await changes.aclose()
+
+    asyncio.run(run())
+
+
+def test_signal_within_cooldown_is_retried_not_dropped(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+    proc.signal_cooldown_seconds = 5.0
+    now = [1000.0]
+    monkeypatch.setattr(esp.time, "time", lambda: now[0])
+    seen = []
+
+    async def fake_entry(signal):
+        seen.append(signal.timestamp)
+
+    monkeypatch.setattr(proc, "_process_entry_signal", fake_entry)
+    line = '{{"timestamp": {ts}, "symbol": "NQ", "side": "BUY", "signal_type": "ENTRY", "source": "nt"}}\n'
+    with proc.external_signals_path.open("w") as f:
+        f.write(line.format(ts=999.5))
+    assert asyncio.run(proc.process_new_signals()) == 1
+
+    # A second signal lands 1s after the first was processed: held back, not lost
+    now[0] = 1001.0
+    with proc.external_signals_path.open("a") as f:
+        f.write(line.format(ts=1001.0))
+    assert asyncio.run(proc.process_new_signals()) == 0
+    assert proc.has_deferred_signals
+
+    # Once the cooldown has passed the retry executes it, without any new file data
+    now[0] = 1005.5
+    assert asyncio.run(proc.process_new_signals()) == 1
+    assert seen == [999.5, 1001.0]
+    assert not proc.has_deferred_signals
+
+
+def test_failed_signal_in_submit_batch_fails_only_its_caller(tmp_path, monkeypatch):
+    proc = make_processor(tmp_path, monkeypatch)
+
+    async def fake_batch(signals, return_exceptions=False):
+        assert return_exceptions
+        return [ZeroDivisionError("bad price") if s["symbol"] == "BAD" else [s["symbol"]] for s in signals]
+
+    monkeypatch.setattr(proc.executor, "submit_enhanced_signal_batch", fake_batch)
+
+    async def run():
+        return await asyncio.gather(*(proc._submit_entry(symbol=sym) for sym in ("S0", "BAD", "S2")),
+                                    return_exceptions=True)
+
+    good0, bad, good2 = asyncio.run(run())
+    assert (good0, good2) == (["S0"], ["S2"])
+    assert isinstance(bad, ZeroDivisionError)
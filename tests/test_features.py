@@ -8,3 +8,36 @@ def test_feature_engine_basic():
     fe.update_orderbook(np.array([10, 9]), np.array([8, 7]))
     snap = fe.snapshot()
     assert 0.0 <= snap.delta_confidence <= 1.0
+
+
+def test_cvd_slope_matches_least_squares():
+    fe = FeatureEngine(window=8)
+    rng = np.random.default_rng(3)
+    cvd = []
+    for buy, sell in rng.uniform(0, 10, size=(21, 2)):
+        fe.update_trades(buy, sell)
+        cvd.append((cvd[-1] if cvd else 0.0) + buy - sell)
+    expected = np.polyfit(np.arange(8), np.array(cvd[-8:]), 1)[0]
+    assert abs(fe.snapshot().cvd_slope - expected) < 1e-9
+
+
+def test_orderbook_imbalance_and_slope():
+    fe = FeatureEngine(window=4)
+    bids, asks = np.array([10.0, 9.0, 1.0]), np.array([8.0, 7.0, 5.0])
+    fe.update_orderbook(bids, asks)
+    snap = fe.snapshot()
+    w = np.arange(1, 4)
+    assert abs(snap.depth_imbalance - (20.0 - 20.0) / 40.0) < 1e-9
+    expected_slope = (bids @ w - asks @ w) / (bids @ w + asks @ w)
+    assert abs(snap.depth_slope - expected_slope) < 1e-9
+
+
+def test_snapshot_buy_ratio_tracks_window():
+    fe = FeatureEngine(window=3)
+    assert fe.snapshot().aggressive_buy_ratio == 0.0
+    for buy, sell in [(1.0, 0.0), (2.0, 2.0), (0.0, 5.0), (4.0, 1.0), (3.0, 3.0), (6.0, 0.0), (0.5, 0.25)]:
+        fe.update_trades(buy, sell)
+    buys, sells = 3.0 + 6.0 + 0.5, 3.0 + 0.0 + 0.25
+    snap = fe.snapshot()
+    assert snap is fe.snapshot()
+    assert abs(snap.aggressive_buy_ratio - buys / (buys + sells)) < 1e-9
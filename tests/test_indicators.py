@@ -20,3 +20,23 @@ def test_heiken_ashi_initialization():
     s = HeikenAshiState()
     o,h,l,c = update_heiken_ashi(s, 10, 11, 9, 10.5)
     assert s.open is not None and s.close is not None
+
+def test_mfi_matches_window_scan():
+    import numpy as np
+    rng = np.random.default_rng(2)
+    period = 5
+    mfi = MoneyFlowIndex(period)
+    tps, vols = [], []
+    for step in range(23):
+        c = 100.0 + rng.normal()
+        h, l, v = c + rng.uniform(0, 1), c - rng.uniform(0, 1), rng.uniform(1, 10)
+        value = mfi.update(h, l, c, v)
+        tps.append((h + l + c) / 3.0)
+        vols.append(v)
+        if len(tps) < period + 1:
+            assert value != value
+            continue
+        pos = sum(vols[j] * tps[j] for j in range(-period, 0) if tps[j] > tps[j - 1])
+        neg = sum(vols[j] * tps[j] for j in range(-period, 0) if tps[j] < tps[j - 1])
+        expected = 100.0 - 100.0 / (1.0 + pos / neg) if neg > 0 else 0.0
+        assert abs(value - expected) < 1e-9
@@ -0,0 +1,19 @@
+import numpy as np
+
+from core.features import FeatureSnapshot
+from core.signals import SignalEngine
+
+
+def snap(delta_confidence: float) -> FeatureSnapshot:
+    return FeatureSnapshot(cvd=0.0, cvd_slope=0.0, depth_imbalance=0.0, depth_slope=0.0,
+                           aggressive_buy_ratio=0.5, delta_confidence=delta_confidence)
+
+
+def test_signal_engine_sides():
+    eng = SignalEngine(ema_period=3, delta_threshold=0.6)
+    assert eng.on_price_and_features(100.0, snap(0.9)).side is None  # price == seeded EMA
+    assert eng.on_price_and_features(102.0, snap(0.9)).side == "BUY"
+    assert eng.on_price_and_features(103.0, snap(0.5)).side is None
+    eng = SignalEngine(ema_period=3, delta_threshold=0.6)
+    eng.on_price_and_features(np.float64(100.0), snap(0.1))
+    assert eng.on_price_and_features(np.float64(98.0), snap(0.1)).side == "SELL"
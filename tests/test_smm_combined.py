@@ -27,3 +27,41 @@ def test_combined_trend_gating():
     d2 = comb.evaluate(99.0, make_snap(0.1))
     assert d2.side == "SELL"
 
+
+
+def test_testing_modes_keep_generic_evaluate(monkeypatch):
+    monkeypatch.setenv("TESTING_SELL_BIAS", "1")
+    comb = SMMCombinedSignal(delta_threshold=0.6)
+    for p in [104, 103, 102, 101, 100]:
+        comb.on_bar(p + 0.5, p + 1.0, p - 0.5, p, 1000)
+    d = comb.evaluate(99.0, make_snap(0.5))
+    assert (d.side, d.reason) == ("SELL", "test_sell_bias")
+
+    monkeypatch.delenv("TESTING_SELL_BIAS")
+    live = SMMCombinedSignal(delta_threshold=0.6)
+    assert live.evaluate == live._evaluate_live
+
+
+def test_cross_source_confirmation_uses_known_sources():
+    comb = SMMCombinedSignal(delta_threshold=0.6)
+    for p in [100, 101, 102, 103, 104]:
+        comb.on_bar(p - 0.5, p + 0.5, p - 1.0, p, 1000)
+    # An unrecognised source enables the requirement but can never confirm
+    comb.on_bar_source("other", 104.0, 105.0, 104.0, 104.9, 1000)
+    d = comb.evaluate(105.0, make_snap(0.9))
+    assert (d.side, d.reason) == (None, "await_xsource_confirm")
+    # A strong bullish tbar12 bar confirms BUY
+    comb.on_bar_source("tbar12", 105.0, 107.0, 105.0, 107.0, 1000)
+    d = comb.evaluate(107.5, make_snap(0.9))
+    assert comb._confirm_sides[0] == 1
+    assert d.side == "BUY"
+
+
+def test_step_matches_on_bar_then_evaluate():
+    a, b = SMMCombinedSignal(delta_threshold=0.6), SMMCombinedSignal(delta_threshold=0.6)
+    for p, dc in [(100, 0.5), (101, 0.7), (102, 0.9), (103, 0.9), (104, 0.9), (103, 0.2)]:
+        a.on_bar(p - 0.5, p + 0.5, p - 1.0, p, 1000)
+        expected = a.evaluate(p + 0.25, make_snap(dc))
+        got = b.step(p - 0.5, p + 0.5, p - 1.0, p, 1000, p + 0.25, make_snap(dc))
+        assert (got.side, got.reason, got.trend_state) == (expected.side, expected.reason, expected.trend_state)
+        assert got.main.ema21 == expected.main.ema21
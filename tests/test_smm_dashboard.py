@@ -0,0 +1,29 @@
+from core.smm.dashboard import DashboardEngine, DashboardState
+
+
+def test_dashboard_states_do_not_share_indicators():
+    a, b = DashboardState(), DashboardState()
+    assert a.ema_fast is not b.ema_fast
+    assert a.atr is not b.atr and a.mfi is not b.mfi and a.ha is not b.ha
+
+    eng_a, eng_b = DashboardEngine(a), DashboardEngine(b)
+    eng_a.on_bar(100.0, 101.0, 99.0, 100.5, 10.0)
+    assert b.ema_fast.previous_ema is None
+    assert eng_b.s.ha.open is None
+
+
+def test_dashboard_state_honours_periods():
+    s = DashboardState(ema_fast_period=5, ema_slow_period=13, atr_period=4, mfi_period=6)
+    assert (s.ema_fast.period, s.ema_slow.period, s.atr.period, s.mfi.period) == (5, 13, 4, 6)
+
+
+def test_specialised_on_bar_matches_generic():
+    bars = [(100.0, 101.0, 99.0, 100.5), (100.5, 102.0, 100.0, 101.8), (101.8, 102.2, 99.5, 99.9), (99.9, 100.4, 98.0, 98.2)]
+    for flag, special in ((True, "on_bar_ha"), (False, "on_bar_raw")):
+        generic, fast = DashboardEngine(), DashboardEngine()
+        for o, h, l, c in bars:
+            generic.on_bar(o, h, l, c, 10.0, use_heiken_ashi=flag)
+            getattr(fast, special)(o, h, l, c, 10.0)
+        assert generic.s.ema_slow.previous_ema == fast.s.ema_slow.previous_ema
+        assert generic.get_trend_state() == fast.get_trend_state()
+        assert (generic._trend_up_prev, generic._trend_dn_prev) == (fast._trend_up_prev, fast._trend_dn_prev)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from core.smm.enhanced import EnhancedSMMEngine, EnhancedSignalConfig
+
+
+def random_bars(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    delta = rng.normal(0, 10, n)
+    return open_, high, low, close, delta
+
+
+def reference_di(high, low, close, length):
+    df = pd.DataFrame({"high": high, "low": low, "close": close})
+    up_move = df["high"].diff()
+    dn_move = -df["low"].diff()
+    plus_dm = ((up_move > dn_move) & (up_move > 0)).astype(float) * up_move.clip(lower=0.0)
+    minus_dm = ((dn_move > up_move) & (dn_move > 0)).astype(float) * dn_move.clip(lower=0.0)
+    tr = np.maximum(df["high"] - df["low"], np.maximum((df["high"] - df["close"].shift()).abs(),
+                                                       (df["low"] - df["close"].shift()).abs()))
+    alpha = 1.0 / length
+    tr_s = tr.ewm(alpha=alpha, adjust=False).mean()
+    return (100.0 * plus_dm.ewm(alpha=alpha, adjust=False).mean() / tr_s).iloc[-1], \
+           (100.0 * minus_dm.ewm(alpha=alpha, adjust=False).mean() / tr_s).iloc[-1]
+
+
+def test_incremental_di_matches_pandas_reference():
+    eng = EnhancedSMMEngine(EnhancedSignalConfig())
+    o, h, l, c, d = random_bars(60)
+    for i in range(60):
+        eng.add_bar(o[i], h[i], l[i], c[i], 1.0, delta=d[i])
+    di_plus, di_minus = eng._calculate_di()
+    ref_plus, ref_minus = reference_di(h, l, c, eng.config.di_len)
+    assert abs(di_plus - ref_plus) < 1e-9
+    assert abs(di_minus - ref_minus) < 1e-9
+
+
+def test_incremental_emas_and_heiken_ashi():
+    eng = EnhancedSMMEngine(EnhancedSignalConfig())
+    o, h, l, c, d = random_bars(60, seed=11)
+    ha_open, ha_close = None, None
+    for i in range(60):
+        eng.add_bar(o[i], h[i], l[i], c[i], 1.0, delta=d[i])
+        ha_open = o[i] if ha_open is None else 0.5 * (ha_open + ha_close)
+        ha_close = (o[i] + h[i] + l[i] + c[i]) / 4.0
+    expected = pd.Series(c).ewm(span=eng.config.profitwave_fast, adjust=False).mean().iloc[-1]
+    assert abs(eng._ema_value(eng._ema_pwf, c[-1]) - expected) < 1e-9
+    # Slow EMA has not seen a full period yet, so it falls back to the close
+    assert eng._ema_value(eng._ema_pws, c[-1]) == c[-1]
+    assert abs(eng._ha.open - ha_open) < 1e-12
+    assert abs(eng._ha.close - ha_close) < 1e-12
+
+
+def test_delta_zscore_tracks_window():
+    eng = EnhancedSMMEngine(EnhancedSignalConfig(delta_lookback=20))
+    o, h, l, c, d = random_bars(75, seed=5)
+    for i in range(75):
+        eng.add_bar(o[i], h[i], l[i], c[i], 1.0, delta=d[i])
+    window = d[-20:]
+    expected = (d[-1] - window.mean()) / window.std()
+    assert abs(eng._calculate_delta_zscore(d[-1]) - expected) < 1e-9
+
+
+def test_generate_signal_reads_latest_bar():
+    eng = EnhancedSMMEngine(EnhancedSignalConfig())
+    o, h, l, c, d = random_bars(40, seed=3)
+    for i in range(40):
+        eng.add_bar(o[i], h[i], l[i], c[i], 1.0, delta=d[i])
+    assert eng.bars[-1].close == c[-1]
+    result = eng.generate_signal()
+    assert result.delta == d[-1]
+    assert result.signal_side in (None, "BUY", "SELL")
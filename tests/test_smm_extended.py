@@ -32,3 +32,56 @@ def test_strong_bear_and_filters():
     d = eng.evaluate(101.5, snap(0.1))
     assert d.side in (None, "SELL")
 
+
+
+def test_on_bars_matches_per_bar_replay():
+    import numpy as np
+
+    rng = np.random.default_rng(9)
+    n = 300
+    c = 100.0 + np.cumsum(rng.normal(0, 1, n))
+    o = c + rng.normal(0, 0.5, n)
+    h = np.maximum(o, c) + rng.uniform(0, 1, n)
+    l = np.minimum(o, c) - rng.uniform(0, 1, n)
+    v = rng.uniform(100, 1000, n)
+    for use_ha in (True, False):
+        seq, batch = SMMMainEngine(use_heiken_ashi=use_ha), SMMMainEngine(use_heiken_ashi=use_ha)
+        for j in range(3):
+            seq.on_bar(o[j], h[j], l[j], c[j], v[j])
+            batch.on_bar(o[j], h[j], l[j], c[j], v[j])
+        for j in range(3, n):
+            seq.on_bar(o[j], h[j], l[j], c[j], v[j])
+        batch.on_bars(o[3:], h[3:], l[3:], c[3:], v[3:])
+        for name in ("ema8", "ema13", "ema21", "ema55"):
+            assert abs(getattr(seq, name).previous_ema - getattr(batch, name).previous_ema) < 1e-9
+        assert abs(seq.atr.previous_atr - batch.atr.previous_atr) < 1e-9
+        assert seq.atr.sample_count == batch.atr.sample_count
+        assert abs(seq.mfi.current_value - batch.mfi.current_value) < 1e-9
+        assert (seq.prev_high, seq.prev_low) == (batch.prev_high, batch.prev_low)
+        assert abs(seq._last_di_plus - batch._last_di_plus) < 1e-9
+        if use_ha:
+            assert abs(seq.ha_state.open - batch.ha_state.open) < 1e-9
+        a = seq.evaluate(c[-1], snap(0.9))
+        b = batch.evaluate(c[-1], snap(0.9))
+        assert (a.side, a.strong_bull, a.trend_bullish) == (b.side, b.strong_bull, b.trend_bullish)
+
+
+def test_di_approx_uses_zero_prev_close():
+    eng = SMMMainEngine()
+    eng.prev_close = 0.0
+    # A genuine 0.0 previous close is used for TR rather than falling back to high/low
+    di_plus, _ = eng._di_approx(2.0, 1.0, 1.0, 1.0)
+    assert abs(di_plus - 100.0 * (1.0 / 2.0)) < 1e-12
+
+
+def test_ewm_last_matches_recursion():
+    import numpy as np
+    from core.smm.main import _ewm_last
+
+    x = np.random.default_rng(3).normal(100.0, 5.0, 2000)
+    for seed in (None, 97.5):
+        for alpha in (2.0 / 9.0, 2.0 / 56.0, 1.0 / 8.0):
+            y = float(x[0]) if seed is None else seed
+            for xi in (x[1:] if seed is None else x):
+                y = y + alpha * (xi - y)
+            assert abs(_ewm_last(seed, x, alpha) - y) < 1e-9
@@ -27,3 +27,14 @@ def test_main_engine_buy_and_sell_paths():
     dec_sell = eng.evaluate(99.0, make_snap(0.1))
     assert dec_sell.side in (None, "SELL")
 
+
+
+def test_evaluate_does_not_mutate_bar_emas():
+    eng = SMMMainEngine(delta_threshold=0.6)
+    for p in [100.0, 101.0, 102.0]:
+        eng.on_bar(p - 0.5, p + 0.5, p - 1.0, p, 1000)
+    before = eng.ema21.previous_ema
+    d1 = eng.evaluate(104.0, make_snap(0.5))
+    d2 = eng.evaluate(104.0, make_snap(0.5))
+    assert eng.ema21.previous_ema == before
+    assert d1.ema21 == d2.ema21 == before + eng.ema21.constant1 * (104.0 - before)
@@ -17,3 +17,10 @@ def test_resolve_front_month_quarters():
 
 
 
+
+
+def test_resolve_front_month_cache_keys_on_year_and_quarter():
+    assert resolve_front_month("NQ", now=datetime(2025, 12, 1)) == ("NQ", "NQZ5")
+    assert resolve_front_month("NQ", now=datetime(2026, 12, 1)) == ("NQ", "NQZ6")
+    assert resolve_front_month("NQ", now=datetime(2026, 1, 2)) == ("NQ", "NQH6")
+    assert resolve_front_month("MNQ", now=datetime(2026, 1, 2)) == ("MNQ", "MNQH6")